@@ -23,8 +23,6 @@
 
 from __future__ import unicode_literals
 
-import datetime
-
 # minimal support for python2.6
 try:
     from collections import OrderedDict
@@ -37,7 +35,7 @@ try:
 except ImportError:
     from cgi import escape
 
-import dns.dnssec
+import dns.dnssec, dns.name
 
 import dnsviz.format as fmt
 from dnsviz.util import tuple_to_dict
@@ -57,6 +55,7 @@ class DomainNameAnalysisError(object):
 
         self.template_kwargs = { 'code': self.code }
         self.servers_clients = {}
+        self._display_ready = False
         for param in self.required_params:
             try:
                 self.template_kwargs[param] = kwargs[param]
@@ -81,16 +80,39 @@ class DomainNameAnalysisError(object):
             self._args = [self.template_kwargs[p] for p in self.required_params]
         return self._args
 
+    def _format_template_kwargs(self):
+        '''Derive template parameters that are needed only for rendering
+        descriptions.  Subclasses with expensive formatting override this to
+        defer the work until a description is actually requested.'''
+        pass
+
+    def _ensure_display_kwargs(self):
+        if not self._display_ready:
+            # cache the raw parameter values before any of them are replaced
+            # with their display forms
+            if getattr(self, '_args', None) is None:
+                self._args = [self.template_kwargs[p] for p in self.required_params]
+            # name parameters may be passed in raw form; humanize them only
+            # now that a description is actually being rendered
+            for param, value in self.template_kwargs.items():
+                if isinstance(value, dns.name.Name):
+                    self.template_kwargs[param] = fmt.humanize_name(value)
+            self._format_template_kwargs()
+            self._display_ready = True
+
     @property
     def description(self):
+        self._ensure_display_kwargs()
         return self.description_template % self.template_kwargs
 
     @property
     def terse_description(self):
+        self._ensure_display_kwargs()
         return self.terse_description_template % self.template_kwargs
 
     @property
     def html_description(self):
+        self._ensure_display_kwargs()
         description_template_escaped = escape(self.description_template, True)
         template_kwargs_escaped = {}
         for n, v in self.template_kwargs.items():
@@ -131,8 +153,7 @@ class DomainNameAnalysisError(object):
         if self.servers_clients:
             servers = tuple_to_dict(self.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = sorted(servers)
             d['servers'] = servers
 
             tags = set()
@@ -215,11 +236,11 @@ class OriginalTTLExceeded(RRSIGError):
 
 class TTLBeyondExpiration(RRSIGError):
     '''
-    >>> e = TTLBeyondExpiration(expiration=datetime.datetime(2015,1,10), rrsig_ttl=86401, reference_time=datetime.datetime(2015,1,9))
+    >>> e = TTLBeyondExpiration(expiration=1420848000, rrsig_ttl=86401, reference_time=1420761600)
     >>> e.args
-    [datetime.datetime(2015, 1, 10, 0, 0), 86401, datetime.datetime(2015, 1, 9, 0, 0)]
+    [1420848000, 86401, 1420761600]
     >>> e.description
-    'With a TTL of 86401 the RRSIG RR can be in the cache of a non-validating resolver until 1 second after it expires at 2015-01-10 00:00:00.'
+    'With a TTL of 86401 the RRSIG RR can be in the cache of a non-validating resolver until 1 second after it expires at 2015-01-10 00:00:00+00:00.'
     '''
 
     _abstract = False
@@ -228,10 +249,10 @@ class TTLBeyondExpiration(RRSIGError):
     references = ['RFC 4035, Sec. 5.3.3']
     required_params = ['expiration', 'rrsig_ttl', 'reference_time']
 
-    def __init__(self, **kwargs):
-        super(TTLBeyondExpiration, self).__init__(**kwargs)
-        diff = self.template_kwargs['reference_time'] + datetime.timedelta(seconds=self.template_kwargs['rrsig_ttl']) - self.template_kwargs['expiration']
-        self.template_kwargs['difference'] = fmt.humanize_time(diff.seconds, diff.days)
+    def _format_template_kwargs(self):
+        days, secs = divmod(self.template_kwargs['reference_time'] + self.template_kwargs['rrsig_ttl'] - self.template_kwargs['expiration'], 86400)
+        self.template_kwargs['expiration'] = fmt.timestamp_to_datetime(self.template_kwargs['expiration'])
+        self.template_kwargs['difference'] = fmt.humanize_time(secs, days)
 
 class AlgorithmNotSupported(RRSIGError):
     '''
@@ -324,11 +345,11 @@ class DNSKEYRevokedRRSIG(RRSIGError):
 
 class InceptionInFuture(RRSIGError):
     '''
-    >>> e = InceptionInFuture(inception=datetime.datetime(2015,1,10), reference_time=datetime.datetime(2015,1,9))
+    >>> e = InceptionInFuture(inception=1420848000, reference_time=1420761600)
     >>> e.args
-    [datetime.datetime(2015, 1, 10, 0, 0), datetime.datetime(2015, 1, 9, 0, 0)]
+    [1420848000, 1420761600]
     >>> e.description
-    'The Signature Inception field of the RRSIG RR (2015-01-10 00:00:00) is 1 day in the future.'
+    'The Signature Inception field of the RRSIG RR (2015-01-10 00:00:00+00:00) is 1 day in the future.'
     '''
 
     _abstract = False
@@ -337,18 +358,18 @@ class InceptionInFuture(RRSIGError):
     references = ['RFC 4035, Sec. 5.3.1']
     required_params = ['inception', 'reference_time']
 
-    def __init__(self, **kwargs):
-        super(InceptionInFuture, self).__init__(**kwargs)
-        diff = self.template_kwargs['inception'] - self.template_kwargs['reference_time']
-        self.template_kwargs['premature_time'] = fmt.humanize_time(diff.seconds, diff.days)
+    def _format_template_kwargs(self):
+        days, secs = divmod(self.template_kwargs['inception'] - self.template_kwargs['reference_time'], 86400)
+        self.template_kwargs['inception'] = fmt.timestamp_to_datetime(self.template_kwargs['inception'])
+        self.template_kwargs['premature_time'] = fmt.humanize_time(secs, days)
 
 class ExpirationInPast(RRSIGError):
     '''
-    >>> e = ExpirationInPast(expiration=datetime.datetime(2015,1,10), reference_time=datetime.datetime(2015,1,11))
+    >>> e = ExpirationInPast(expiration=1420848000, reference_time=1420934400)
     >>> e.args
-    [datetime.datetime(2015, 1, 10, 0, 0), datetime.datetime(2015, 1, 11, 0, 0)]
+    [1420848000, 1420934400]
     >>> e.description
-    'The Signature Expiration field of the RRSIG RR (2015-01-10 00:00:00) is 1 day in the past.'
+    'The Signature Expiration field of the RRSIG RR (2015-01-10 00:00:00+00:00) is 1 day in the past.'
     '''
 
     _abstract = False
@@ -357,16 +378,16 @@ class ExpirationInPast(RRSIGError):
     references = ['RFC 4035, Sec. 5.3.1']
     required_params = ['expiration', 'reference_time']
 
-    def __init__(self, **kwargs):
-        super(ExpirationInPast, self).__init__(**kwargs)
-        diff = self.template_kwargs['reference_time'] - self.template_kwargs['expiration']
-        self.template_kwargs['expired_time'] = fmt.humanize_time(diff.seconds, diff.days)
+    def _format_template_kwargs(self):
+        days, secs = divmod(self.template_kwargs['reference_time'] - self.template_kwargs['expiration'], 86400)
+        self.template_kwargs['expiration'] = fmt.timestamp_to_datetime(self.template_kwargs['expiration'])
+        self.template_kwargs['expired_time'] = fmt.humanize_time(secs, days)
 
 class InceptionWithinClockSkew(RRSIGError):
     '''
-    >>> e = InceptionWithinClockSkew(inception=datetime.datetime(2015,1,10,0,0,0), reference_time=datetime.datetime(2015,1,10,0,0,1))
+    >>> e = InceptionWithinClockSkew(inception=1420848000, reference_time=1420848001)
     >>> e.description
-    'The value of the Signature Inception field of the RRSIG RR (2015-01-10 00:00:00) is within possible clock skew range (1 second) of the current time (2015-01-10 00:00:01).'
+    'The value of the Signature Inception field of the RRSIG RR (2015-01-10 00:00:00+00:00) is within possible clock skew range (1 second) of the current time (2015-01-10 00:00:01+00:00).'
     '''
 
     _abstract = False
@@ -375,16 +396,17 @@ class InceptionWithinClockSkew(RRSIGError):
     references = ['RFC 4035, Sec. 5.3.1']
     required_params = ['inception', 'reference_time']
 
-    def __init__(self, **kwargs):
-        super(InceptionWithinClockSkew, self).__init__(**kwargs)
-        diff = self.template_kwargs['reference_time'] - self.template_kwargs['inception']
-        self.template_kwargs['difference'] = fmt.humanize_time(diff.seconds, diff.days)
+    def _format_template_kwargs(self):
+        days, secs = divmod(self.template_kwargs['reference_time'] - self.template_kwargs['inception'], 86400)
+        self.template_kwargs['inception'] = fmt.timestamp_to_datetime(self.template_kwargs['inception'])
+        self.template_kwargs['reference_time'] = fmt.timestamp_to_datetime(self.template_kwargs['reference_time'])
+        self.template_kwargs['difference'] = fmt.humanize_time(secs, days)
 
 class ExpirationWithinClockSkew(RRSIGError):
     '''
-    >>> e = ExpirationWithinClockSkew(expiration=datetime.datetime(2015,1,10,0,0,1), reference_time=datetime.datetime(2015,1,10,0,0,0))
+    >>> e = ExpirationWithinClockSkew(expiration=1420848001, reference_time=1420848000)
     >>> e.description
-    'The value of the Signature Expiration field of the RRSIG RR (2015-01-10 00:00:01) is within possible clock skew range (1 second) of the current time (2015-01-10 00:00:00).'
+    'The value of the Signature Expiration field of the RRSIG RR (2015-01-10 00:00:01+00:00) is within possible clock skew range (1 second) of the current time (2015-01-10 00:00:00+00:00).'
     '''
 
     _abstract = False
@@ -393,10 +415,11 @@ class ExpirationWithinClockSkew(RRSIGError):
     references = ['RFC 4035, Sec. 5.3.1']
     required_params = ['expiration', 'reference_time']
 
-    def __init__(self, **kwargs):
-        super(ExpirationWithinClockSkew, self).__init__(**kwargs)
-        diff = self.template_kwargs['expiration'] - self.template_kwargs['reference_time']
-        self.template_kwargs['difference'] = fmt.humanize_time(diff.seconds, diff.days)
+    def _format_template_kwargs(self):
+        days, secs = divmod(self.template_kwargs['expiration'] - self.template_kwargs['reference_time'], 86400)
+        self.template_kwargs['expiration'] = fmt.timestamp_to_datetime(self.template_kwargs['expiration'])
+        self.template_kwargs['reference_time'] = fmt.timestamp_to_datetime(self.template_kwargs['reference_time'])
+        self.template_kwargs['difference'] = fmt.humanize_time(secs, days)
 
 class SignatureInvalid(RRSIGError):
     '''
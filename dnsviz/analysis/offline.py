@@ -2746,10 +2746,10 @@ class OfflineDomainNameAnalysis(OnlineDomainNameAnalysis):
                 d['cookie_status'] = cookie_tag_mapping
 
         if self.rrset_warnings[rrset_info] and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.rrset_warnings[rrset_info]]
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in self.rrset_warnings[rrset_info]]
 
         if self.rrset_errors[rrset_info] and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.rrset_errors[rrset_info]]
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in self.rrset_errors[rrset_info]]
 
         return d
 
@@ -2824,10 +2824,10 @@ class OfflineDomainNameAnalysis(OnlineDomainNameAnalysis):
             d['cookie_status'] = cookie_tag_mapping
 
         if warnings[neg_response_info] and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in warnings[neg_response_info]]
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in warnings[neg_response_info]]
 
         if errors[neg_response_info] and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in errors[neg_response_info]]
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in errors[neg_response_info]]
 
         return d
 
@@ -2936,10 +2936,10 @@ class OfflineDomainNameAnalysis(OnlineDomainNameAnalysis):
             d['status'] = Status.delegation_status_mapping[self.delegation_status[rdtype]]
 
         if self.delegation_warnings[rdtype] and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.delegation_warnings[rdtype]]
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in self.delegation_warnings[rdtype]]
 
         if self.delegation_errors[rdtype] and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.delegation_errors[rdtype]]
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in self.delegation_errors[rdtype]]
 
         return d
 
@@ -2990,10 +2990,10 @@ class OfflineDomainNameAnalysis(OnlineDomainNameAnalysis):
             d['status'] = Status.delegation_status_mapping[self.response_component_status[self]]
 
         if self.zone_warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.zone_warnings]
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in self.zone_warnings]
 
         if self.zone_errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.zone_errors]
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in self.zone_errors]
 
         return d
 
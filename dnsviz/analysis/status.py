@@ -29,14 +29,10 @@ from __future__ import unicode_literals
 
 import base64
 import datetime
+import hashlib
+import itertools
 import logging
 
-# minimal support for python2.6
-try:
-    from collections import OrderedDict
-except ImportError:
-    from ordereddict import OrderedDict
-
 # python3/python2 dual compatibility
 try:
     from html import escape
@@ -53,8 +49,22 @@ lb2s = fmt.latin1_binary_to_string
 
 from . import errors as Errors
 
+# aliases for frequently used dns.rdatatype members, to avoid repeated
+# attribute lookups in hot paths
+_rdt_to_text = dns.rdatatype.to_text
+_RDT_CNAME = dns.rdatatype.CNAME
+_RDT_DNSKEY = dns.rdatatype.DNSKEY
+_RDT_NS = dns.rdatatype.NS
+_RDT_DS = dns.rdatatype.DS
+_RDT_SOA = dns.rdatatype.SOA
+
+_fmt_nsec3 = fmt.format_nsec3_name
+
 CLOCK_SKEW_WARNING = 300
 
+# label tuple used to splice together wildcard names without parsing text
+STAR = ('*',)
+
 STATUS_VALID = 0
 STATUS_INDETERMINATE = 1
 STATUS_INVALID = 2
@@ -70,11 +80,11 @@ status_mapping = {
 NAME_STATUS_NOERROR = 0
 NAME_STATUS_NXDOMAIN = 1
 NAME_STATUS_INDETERMINATE = 2
-name_status_mapping = {
-        NAME_STATUS_NOERROR: 'NOERROR',
-        NAME_STATUS_NXDOMAIN: 'NXDOMAIN',
-        NAME_STATUS_INDETERMINATE: 'INDETERMINATE',
-}
+name_status_mapping = (
+        'NOERROR',
+        'NXDOMAIN',
+        'INDETERMINATE',
+)
 
 RRSIG_STATUS_VALID = STATUS_VALID
 RRSIG_STATUS_INDETERMINATE_NO_DNSKEY = 1
@@ -85,17 +95,17 @@ RRSIG_STATUS_EXPIRED = 5
 RRSIG_STATUS_PREMATURE = 6
 RRSIG_STATUS_INVALID_SIG = 7
 RRSIG_STATUS_INVALID = 8
-rrsig_status_mapping = {
-        RRSIG_STATUS_VALID: 'VALID',
-        RRSIG_STATUS_INDETERMINATE_NO_DNSKEY: 'INDETERMINATE_NO_DNSKEY',
-        RRSIG_STATUS_INDETERMINATE_MATCH_PRE_REVOKE: 'INDETERMINATE_MATCH_PRE_REVOKE',
-        RRSIG_STATUS_INDETERMINATE_UNKNOWN_ALGORITHM: 'INDETERMINATE_UNKNOWN_ALGORITHM',
-        RRSIG_STATUS_ALGORITHM_IGNORED: 'ALGORITHM_IGNORED',
-        RRSIG_STATUS_EXPIRED: 'EXPIRED',
-        RRSIG_STATUS_PREMATURE: 'PREMATURE',
-        RRSIG_STATUS_INVALID_SIG: 'INVALID_SIG',
-        RRSIG_STATUS_INVALID: 'INVALID',
-}
+rrsig_status_mapping = (
+        'VALID',
+        'INDETERMINATE_NO_DNSKEY',
+        'INDETERMINATE_MATCH_PRE_REVOKE',
+        'INDETERMINATE_UNKNOWN_ALGORITHM',
+        'ALGORITHM_IGNORED',
+        'EXPIRED',
+        'PREMATURE',
+        'INVALID_SIG',
+        'INVALID',
+)
 
 DS_STATUS_VALID = STATUS_VALID
 DS_STATUS_INDETERMINATE_NO_DNSKEY = 1
@@ -104,59 +114,69 @@ DS_STATUS_INDETERMINATE_UNKNOWN_ALGORITHM = 3
 DS_STATUS_ALGORITHM_IGNORED = 4
 DS_STATUS_INVALID_DIGEST = 5
 DS_STATUS_INVALID = 6
-ds_status_mapping = {
-        DS_STATUS_VALID: 'VALID',
-        DS_STATUS_INDETERMINATE_NO_DNSKEY: 'INDETERMINATE_NO_DNSKEY',
-        DS_STATUS_INDETERMINATE_MATCH_PRE_REVOKE: 'INDETERMINATE_MATCH_PRE_REVOKE',
-        DS_STATUS_INDETERMINATE_UNKNOWN_ALGORITHM: 'INDETERMINATE_UNKNOWN_ALGORITHM',
-        DS_STATUS_ALGORITHM_IGNORED: 'ALGORITHM_IGNORED',
-        DS_STATUS_INVALID_DIGEST: 'INVALID_DIGEST',
-        DS_STATUS_INVALID: 'INVALID',
-}
+ds_status_mapping = (
+        'VALID',
+        'INDETERMINATE_NO_DNSKEY',
+        'INDETERMINATE_MATCH_PRE_REVOKE',
+        'INDETERMINATE_UNKNOWN_ALGORITHM',
+        'ALGORITHM_IGNORED',
+        'INVALID_DIGEST',
+        'INVALID',
+)
 
 DELEGATION_STATUS_SECURE = 0
 DELEGATION_STATUS_INSECURE = 1
 DELEGATION_STATUS_BOGUS = 2
 DELEGATION_STATUS_INCOMPLETE = 3
 DELEGATION_STATUS_LAME = 4
-delegation_status_mapping = {
-        DELEGATION_STATUS_SECURE: 'SECURE',
-        DELEGATION_STATUS_INSECURE: 'INSECURE',
-        DELEGATION_STATUS_BOGUS: 'BOGUS',
-        DELEGATION_STATUS_INCOMPLETE: 'INCOMPLETE',
-        DELEGATION_STATUS_LAME: 'LAME',
-}
+delegation_status_mapping = (
+        'SECURE',
+        'INSECURE',
+        'BOGUS',
+        'INCOMPLETE',
+        'LAME',
+)
 
 RRSET_STATUS_SECURE = 0
 RRSET_STATUS_INSECURE = 1
 RRSET_STATUS_BOGUS = 2
 RRSET_STATUS_NON_EXISTENT = 3
-rrset_status_mapping = {
-        RRSET_STATUS_SECURE: 'SECURE',
-        RRSET_STATUS_INSECURE: 'INSECURE',
-        RRSET_STATUS_BOGUS: 'BOGUS',
-        RRSET_STATUS_NON_EXISTENT: 'NON_EXISTENT',
-}
+rrset_status_mapping = (
+        'SECURE',
+        'INSECURE',
+        'BOGUS',
+        'NON_EXISTENT',
+)
 
 NSEC_STATUS_VALID = STATUS_VALID
 NSEC_STATUS_INDETERMINATE = STATUS_INDETERMINATE
 NSEC_STATUS_INVALID = 2
-nsec_status_mapping = {
-        NSEC_STATUS_VALID: 'VALID',
-        NSEC_STATUS_INDETERMINATE: 'INDETERMINATE',
-        NSEC_STATUS_INVALID: 'INVALID',
-}
+nsec_status_mapping = (
+        'VALID',
+        'INDETERMINATE',
+        'INVALID',
+)
+
+# bit flags recording which rdtypes appear in the bitmaps of the NSEC3
+# records matching the query name and the corresponding wildcard
+_HAS_RDTYPE = 0x01
+_HAS_CNAME = 0x02
+_HAS_NS = 0x04
+_HAS_DS = 0x08
+_HAS_SOA = 0x10
+_WILDCARD_HAS_RDTYPE = 0x20
+_WILDCARD_HAS_CNAME = 0x40
 
 DNAME_STATUS_VALID = STATUS_VALID
 DNAME_STATUS_INDETERMINATE = STATUS_INDETERMINATE
 DNAME_STATUS_INVALID_TARGET = 2
 DNAME_STATUS_INVALID = 3
-dname_status_mapping = {
-        DNAME_STATUS_VALID: 'VALID',
-        DNAME_STATUS_INDETERMINATE: 'INDETERMINATE',
-        DNAME_STATUS_INVALID_TARGET: 'INVALID_TARGET',
-        DNAME_STATUS_INVALID: 'INVALID',
-}
+dname_status_mapping = (
+        'VALID',
+        'INDETERMINATE',
+        'INVALID_TARGET',
+        'INVALID',
+)
 
 RRSIG_SIG_LENGTHS_BY_ALGORITHM = {
         12: 512, 13: 512, 14: 768, 15: 512, 16: 912,
@@ -166,6 +186,8 @@ RRSIG_SIG_LENGTH_ERRORS = {
         14: Errors.RRSIGBadLengthECDSA384, 15: Errors.RRSIGBadLengthEd25519,
         16: Errors.RRSIGBadLengthEd448,
 }
+_REVOKE_FLAG = fmt.DNSKEY_FLAGS['revoke']
+
 DS_DIGEST_ALGS_STRONGER_THAN_SHA1 = (2, 4)
 DS_DIGEST_ALGS_IGNORING_SHA1 = (2,)
 
@@ -179,7 +201,106 @@ DS_DIGEST_ALGS_NOT_RECOMMENDED = ()
 DS_DIGEST_ALGS_PROHIBITED = (0, 1, 3)
 DS_DIGEST_ALGS_VALIDATION_PROHIBITED = ()
 
+# Because the same RRSIG or DS is frequently re-evaluated across multiple
+# responses, the results of cryptographic validation are cached, keyed by the
+# validation inputs.  The (potentially large) message contents are hashed, so
+# the keys stay small.  The caches are simply cleared when they reach their
+# maximum size, which effectively never happens in a single analysis.
+_VALIDATION_CACHE_MAX_SIZE = 8192
+_rrsig_validation_cache = {}
+_ds_validation_cache = {}
+
+# Names rebuilt from label slices (next closest enclosers, wildcard bases)
+# compare equal across thousands of status objects; intern them so equal
+# names share one object and later equality checks can short-circuit on
+# identity.  dns.name.Name does not support weak references, so this is a
+# bounded plain dict rather than a WeakValueDictionary.
+_NAME_INTERN_MAX_SIZE = 4096
+_name_intern = {}
+
+def _intern_name(name):
+    try:
+        return _name_intern[name]
+    except KeyError:
+        if len(_name_intern) >= _NAME_INTERN_MAX_SIZE:
+            _name_intern.clear()
+        _name_intern[name] = name
+        return name
+
+# Many status objects within a zone share the same closest encloser, and
+# dns.name.Name is immutable and hashable, so the wildcard name derived from
+# a given parent can be shared rather than rebuilt per object.
+_wildcard_name_cache = {}
+
+def _wildcard_for(name):
+    try:
+        return _wildcard_name_cache[name]
+    except KeyError:
+        if len(_wildcard_name_cache) >= _NAME_INTERN_MAX_SIZE:
+            _wildcard_name_cache.clear()
+        wildcard = dns.name.Name(STAR + name.labels)
+        _wildcard_name_cache[name] = wildcard
+        return wildcard
+
+# dns.name.Name is immutable, so the canonical text form of a given name
+# never changes; cache it rather than creating a new name object and
+# rebuilding the string every time one is serialized.
+_NAME_TEXT_CACHE_MAX_SIZE = 4096
+_canonical_name_text_cache = {}
+
+def _canon_text(name):
+    try:
+        return _canonical_name_text_cache[name]
+    except KeyError:
+        if len(_canonical_name_text_cache) >= _NAME_TEXT_CACHE_MAX_SIZE:
+            _canonical_name_text_cache.clear()
+        text = lb2s(name.canonicalize().to_text())
+        _canonical_name_text_cache[name] = text
+        return text
+
+# the same applies to the human-readable form used in descriptions and
+# error messages, which is derived from the canonical form
+_humanized_name_text_cache = {}
+
+def _human_text(name):
+    try:
+        return _humanized_name_text_cache[name]
+    except KeyError:
+        if len(_humanized_name_text_cache) >= _NAME_TEXT_CACHE_MAX_SIZE:
+            _humanized_name_text_cache.clear()
+        text = fmt.humanize_name(name)
+        _humanized_name_text_cache[name] = text
+        return text
+
+def _validate_rrsig_cached(alg, sig, msg, key):
+    cache_key = (alg, sig, hashlib.sha256(msg).digest(), key)
+    try:
+        return _rrsig_validation_cache[cache_key]
+    except KeyError:
+        if len(_rrsig_validation_cache) >= _VALIDATION_CACHE_MAX_SIZE:
+            _rrsig_validation_cache.clear()
+        result = crypto.validate_rrsig(alg, sig, msg, key)
+        _rrsig_validation_cache[cache_key] = result
+        return result
+
+def _validate_ds_digest_cached(digest_alg, digest, msg):
+    cache_key = (digest_alg, digest, hashlib.sha256(msg).digest())
+    try:
+        return _ds_validation_cache[cache_key]
+    except KeyError:
+        if len(_ds_validation_cache) >= _VALIDATION_CACHE_MAX_SIZE:
+            _ds_validation_cache.clear()
+        result = crypto.validate_ds_digest(digest_alg, digest, msg)
+        _ds_validation_cache[cache_key] = result
+        return result
+
 class RRSIGStatus(object):
+    # the attribute set is fixed, so avoid the per-instance __dict__; these
+    # objects are created once per RRSIG per response
+    __slots__ = ('rrset', 'rrsig', 'dnskey', 'zone_name', 'reference_ts',
+            'warnings', 'errors', 'signature_valid', 'validation_status',
+            '_rrsig_info')
+
     def __init__(self, rrset, rrsig, dnskey, zone_name, reference_ts, supported_algs):
         self.rrset = rrset
         self.rrsig = rrsig
@@ -191,8 +312,13 @@ class RRSIGStatus(object):
 
         if self.dnskey is None:
             self.signature_valid = None
+        elif not crypto.alg_is_supported(dnskey.rdata.algorithm):
+            # The signature can't be checked, so don't spend the time building
+            # the canonical message that would never be examined;
+            # validate_rrsig() still logs the lack of algorithm support.
+            self.signature_valid = crypto.validate_rrsig(dnskey.rdata.algorithm, rrsig.signature, b'', dnskey.rdata.key)
         else:
-            self.signature_valid = crypto.validate_rrsig(dnskey.rdata.algorithm, rrsig.signature, rrset.message_for_rrsig(rrsig), dnskey.rdata.key)
+            self.signature_valid = _validate_rrsig_cached(dnskey.rdata.algorithm, rrsig.signature, rrset.message_for_rrsig(rrsig), dnskey.rdata.key)
 
         self.validation_status = RRSIG_STATUS_VALID
         if self.signature_valid is None or self.rrsig.algorithm not in supported_algs:
@@ -235,74 +361,94 @@ class RRSIGStatus(object):
         elif self.rrsig.algorithm in DNSKEY_ALGS_NOT_RECOMMENDED:
             self.warnings.append(Errors.AlgorithmNotRecommended(algorithm=self.rrsig.algorithm))
 
+        self._rrsig_info = self.rrset.rrsig_info[self.rrsig]
         if self.rrset.ttl_cmp:
-            if self.rrset.rrset.ttl != self.rrset.rrsig_info[self.rrsig].ttl:
-                self.warnings.append(Errors.RRsetTTLMismatch(rrset_ttl=self.rrset.rrset.ttl, rrsig_ttl=self.rrset.rrsig_info[self.rrsig].ttl))
-        if self.rrset.rrsig_info[self.rrsig].ttl > self.rrsig.original_ttl:
+            if self.rrset.rrset.ttl != self._rrsig_info.ttl:
+                self.warnings.append(Errors.RRsetTTLMismatch(rrset_ttl=self.rrset.rrset.ttl, rrsig_ttl=self._rrsig_info.ttl))
+        if self._rrsig_info.ttl > self.rrsig.original_ttl:
             self.errors.append(Errors.OriginalTTLExceeded(rrset_ttl=self.rrset.rrset.ttl, original_ttl=self.rrsig.original_ttl))
 
-        min_ttl = min(self.rrset.rrset.ttl, self.rrset.rrsig_info[self.rrsig].ttl, self.rrsig.original_ttl)
+        min_ttl = min(self.rrset.rrset.ttl, self._rrsig_info.ttl, self.rrsig.original_ttl)
+
+        # Run the remaining checks in order.  Every check contributes its
+        # warnings and errors, but only the first check that signals a
+        # non-VALID status determines the final status.
+        for check in self._STATUS_CHECKS:
+            status = check(self, min_ttl, supported_algs)
+            if status is not None and self.validation_status == RRSIG_STATUS_VALID:
+                self.validation_status = status
 
-        if (zone_name is not None and self.rrsig.signer != zone_name) or \
-                (zone_name is None and not self.rrset.rrset.name.is_subdomain(self.rrsig.signer)):
-            if self.validation_status == RRSIG_STATUS_VALID:
-                self.validation_status = RRSIG_STATUS_INVALID
-            if zone_name is None:
+    def _check_signer(self, min_ttl, supported_algs):
+        if (self.zone_name is not None and self.rrsig.signer != self.zone_name) or \
+                (self.zone_name is None and not self.rrset.rrset.name.is_subdomain(self.rrsig.signer)):
+            if self.zone_name is None:
                 zn = self.rrsig.signer
             else:
-                zn = zone_name
-            self.errors.append(Errors.SignerNotZone(zone_name=fmt.humanize_name(zn), signer_name=fmt.humanize_name(self.rrsig.signer)))
+                zn = self.zone_name
+            self.errors.append(Errors.SignerNotZone(zone_name=zn, signer_name=self.rrsig.signer))
+            return RRSIG_STATUS_INVALID
+        return None
 
+    def _check_revoke(self, min_ttl, supported_algs):
         if self.dnskey is not None and \
-                self.dnskey.rdata.flags & fmt.DNSKEY_FLAGS['revoke'] and self.rrsig.covers() != dns.rdatatype.DNSKEY:
+                self.dnskey.rdata.flags & _REVOKE_FLAG and self.rrsig.covers() != _RDT_DNSKEY:
             if self.rrsig.key_tag != self.dnskey.key_tag:
-                if self.validation_status == RRSIG_STATUS_VALID:
-                    self.validation_status = RRSIG_STATUS_INDETERMINATE_MATCH_PRE_REVOKE
+                return RRSIG_STATUS_INDETERMINATE_MATCH_PRE_REVOKE
             else:
                 self.errors.append(Errors.DNSKEYRevokedRRSIG())
-                if self.validation_status == RRSIG_STATUS_VALID:
-                    self.validation_status = RRSIG_STATUS_INVALID
+                return RRSIG_STATUS_INVALID
+        return None
 
+    def _check_sig_length(self, min_ttl, supported_algs):
         sig_len = len(self.rrsig.signature) << 3
         if self.rrsig.algorithm in RRSIG_SIG_LENGTHS_BY_ALGORITHM and \
                 sig_len != RRSIG_SIG_LENGTHS_BY_ALGORITHM[self.rrsig.algorithm]:
             self.errors.append(RRSIG_SIG_LENGTH_ERRORS[self.rrsig.algorithm](length=sig_len))
+        return None
 
+    def _check_inception(self, min_ttl, supported_algs):
         if self.reference_ts < self.rrsig.inception:
-            if self.validation_status == RRSIG_STATUS_VALID:
-                self.validation_status = RRSIG_STATUS_PREMATURE
-            self.errors.append(Errors.InceptionInFuture(inception=fmt.timestamp_to_datetime(self.rrsig.inception), reference_time=fmt.timestamp_to_datetime(self.reference_ts)))
+            self.errors.append(Errors.InceptionInFuture(inception=self.rrsig.inception, reference_time=self.reference_ts))
+            return RRSIG_STATUS_PREMATURE
         elif self.reference_ts - CLOCK_SKEW_WARNING < self.rrsig.inception:
-            self.warnings.append(Errors.InceptionWithinClockSkew(inception=fmt.timestamp_to_datetime(self.rrsig.inception), reference_time=fmt.timestamp_to_datetime(self.reference_ts)))
+            self.warnings.append(Errors.InceptionWithinClockSkew(inception=self.rrsig.inception, reference_time=self.reference_ts))
+        return None
 
+    def _check_expiration(self, min_ttl, supported_algs):
         if self.reference_ts >= self.rrsig.expiration:
-            if self.validation_status == RRSIG_STATUS_VALID:
-                self.validation_status = RRSIG_STATUS_EXPIRED
-            self.errors.append(Errors.ExpirationInPast(expiration=fmt.timestamp_to_datetime(self.rrsig.expiration), reference_time=fmt.timestamp_to_datetime(self.reference_ts)))
+            self.errors.append(Errors.ExpirationInPast(expiration=self.rrsig.expiration, reference_time=self.reference_ts))
+            return RRSIG_STATUS_EXPIRED
         elif self.reference_ts + min_ttl > self.rrsig.expiration:
-            self.errors.append(Errors.TTLBeyondExpiration(expiration=fmt.timestamp_to_datetime(self.rrsig.expiration), rrsig_ttl=min_ttl, reference_time=fmt.timestamp_to_datetime(self.reference_ts)))
+            self.errors.append(Errors.TTLBeyondExpiration(expiration=self.rrsig.expiration, rrsig_ttl=min_ttl, reference_time=self.reference_ts))
         elif self.reference_ts + CLOCK_SKEW_WARNING >= self.rrsig.expiration:
-            self.warnings.append(Errors.ExpirationWithinClockSkew(expiration=fmt.timestamp_to_datetime(self.rrsig.expiration), reference_time=fmt.timestamp_to_datetime(self.reference_ts)))
+            self.warnings.append(Errors.ExpirationWithinClockSkew(expiration=self.rrsig.expiration, reference_time=self.reference_ts))
+        return None
 
+    def _check_signature(self, min_ttl, supported_algs):
         if self.signature_valid == False and self.dnskey.rdata.algorithm in supported_algs:
             # only report this if we're not referring to a key revoked post-sign
             if self.dnskey.key_tag == self.rrsig.key_tag:
-                if self.validation_status == RRSIG_STATUS_VALID:
-                    self.validation_status = RRSIG_STATUS_INVALID_SIG
                 self.errors.append(Errors.SignatureInvalid())
+                return RRSIG_STATUS_INVALID_SIG
+        return None
+
+    _STATUS_CHECKS = (_check_signer, _check_revoke, _check_sig_length,
+            _check_inception, _check_expiration, _check_signature)
 
     def __str__(self):
-        return 'RRSIG covering %s/%s' % (fmt.humanize_name(self.rrset.rrset.name), dns.rdatatype.to_text(self.rrset.rrset.rdtype))
+        return 'RRSIG covering %s/%s' % (_human_text(self.rrset.rrset.name), _rdt_to_text(self.rrset.rrset.rdtype))
 
     def serialize(self, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
-        d = OrderedDict()
+        warnings = self.warnings
+        errors = self.errors
+        d = {}
 
         erroneous_status = self.validation_status not in (RRSIG_STATUS_VALID, RRSIG_STATUS_INDETERMINATE_NO_DNSKEY, RRSIG_STATUS_INDETERMINATE_UNKNOWN_ALGORITHM)
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                erroneous_status
+        show_id = erroneous_status or \
+                loglevel <= logging.INFO or \
+                (warnings and loglevel <= logging.WARNING) or \
+                (errors and loglevel <= logging.ERROR)
 
         if html_format:
             formatter = lambda x: escape(x, True)
@@ -310,12 +456,12 @@ class RRSIGStatus(object):
             formatter = lambda x: x
 
         if show_id:
-            d['id'] = '%s/%d/%d' % (lb2s(self.rrsig.signer.canonicalize().to_text()), self.rrsig.algorithm, self.rrsig.key_tag)
+            d['id'] = '%s/%d/%d' % (_canon_text(self.rrsig.signer), self.rrsig.algorithm, self.rrsig.key_tag)
 
         if loglevel <= logging.DEBUG:
             d.update((
                 ('description', formatter(str(self))),
-                ('signer', formatter(lb2s(self.rrsig.signer.canonicalize().to_text()))),
+                ('signer', formatter(_canon_text(self.rrsig.signer))),
                 ('algorithm', self.rrsig.algorithm),
                 ('key_tag', self.rrsig.key_tag),
                 ('original_ttl', self.rrsig.original_ttl),
@@ -323,7 +469,7 @@ class RRSIGStatus(object):
                 ('inception', fmt.timestamp_to_str(self.rrsig.inception)),
                 ('expiration', fmt.timestamp_to_str(self.rrsig.expiration)),
                 ('signature', lb2s(base64.b64encode(self.rrsig.signature))),
-                ('ttl', self.rrset.rrsig_info[self.rrsig].ttl),
+                ('ttl', self._rrsig_info.ttl),
             ))
 
             if html_format:
@@ -335,27 +481,27 @@ class RRSIGStatus(object):
                     d['labels'] = '%d (no wildcard)' % (self.rrsig.labels)
                 d['inception'] += ' (%s)' % (fmt.format_diff(fmt.timestamp_to_datetime(self.reference_ts), fmt.timestamp_to_datetime(self.rrsig.inception)))
                 d['expiration'] += ' (%s)' % (fmt.format_diff(fmt.timestamp_to_datetime(self.reference_ts), fmt.timestamp_to_datetime(self.rrsig.expiration)))
-                d['ttl'] = '%d (%s)' % (self.rrset.rrsig_info[self.rrsig].ttl, fmt.humanize_time(self.rrset.rrsig_info[self.rrsig].ttl))
+                d['ttl'] = '%d (%s)' % (self._rrsig_info.ttl, fmt.humanize_time(self._rrsig_info.ttl))
 
         if loglevel <= logging.INFO or erroneous_status:
             d['status'] = rrsig_status_mapping[self.validation_status]
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.rrset.rrsig_info[self.rrsig].servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self._rrsig_info.servers_sorted()
+            else:
+                servers = tuple_to_dict(self._rrsig_info.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
             tags = set()
             nsids = set()
-            for server,client in self.rrset.rrsig_info[self.rrsig].servers_clients:
-                for response in self.rrset.rrsig_info[self.rrsig].servers_clients[(server, client)]:
+            for server,client in self._rrsig_info.servers_clients:
+                for response in self._rrsig_info.servers_clients[(server, client)]:
                     if response is not None:
                         tags.add(response.effective_query_tag())
                         nsid = response.nsid_val()
@@ -369,15 +515,18 @@ class RRSIGStatus(object):
             d['query_options'] = list(tags)
             d['query_options'].sort()
 
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+        if warnings and loglevel <= logging.WARNING:
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in warnings]
 
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+        if errors and loglevel <= logging.ERROR:
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in errors]
 
         return d
 
 class DSStatus(object):
+    __slots__ = ('ds', 'ds_meta', 'dnskey', 'warnings', 'errors',
+            'digest_valid', 'validation_status')
+
     def __init__(self, ds, ds_meta, dnskey, supported_digest_algs):
         self.ds = ds
         self.ds_meta = ds_meta
@@ -388,7 +537,7 @@ class DSStatus(object):
         if self.dnskey is None:
             self.digest_valid = None
         else:
-            self.digest_valid = crypto.validate_ds_digest(ds.digest_type, ds.digest, dnskey.message_for_ds())
+            self.digest_valid = _validate_ds_digest_cached(ds.digest_type, ds.digest, dnskey.message_for_ds())
 
         self.validation_status = DS_STATUS_VALID
         if self.digest_valid is None or self.ds.digest_type not in supported_digest_algs:
@@ -431,7 +580,7 @@ class DSStatus(object):
             self.warnings.append(Errors.DigestAlgorithmNotRecommended(algorithm=self.ds.digest_type))
 
         if self.dnskey is not None and \
-                self.dnskey.rdata.flags & fmt.DNSKEY_FLAGS['revoke']:
+                self.dnskey.rdata.flags & _REVOKE_FLAG:
             if self.dnskey.key_tag != self.ds.key_tag:
                 if self.validation_status == DS_STATUS_VALID:
                     self.validation_status = DS_STATUS_INDETERMINATE_MATCH_PRE_REVOKE
@@ -473,17 +622,19 @@ class DSStatus(object):
                         self.warnings.append(Errors.DSDigestAlgorithmMaybeIgnored(algorithm=1, new_algorithm=digest_alg))
 
     def __str__(self):
-        return '%s record(s) corresponding to DNSKEY for %s (algorithm %d (%s), key tag %d)' % (dns.rdatatype.to_text(self.ds_meta.rrset.rdtype), fmt.humanize_name(self.ds_meta.rrset.name), self.ds.algorithm, fmt.DNSKEY_ALGORITHMS.get(self.ds.algorithm, self.ds.algorithm), self.ds.key_tag)
+        return '%s record(s) corresponding to DNSKEY for %s (algorithm %d (%s), key tag %d)' % (_rdt_to_text(self.ds_meta.rrset.rdtype), _human_text(self.ds_meta.rrset.name), self.ds.algorithm, fmt.DNSKEY_ALGORITHMS.get(self.ds.algorithm, self.ds.algorithm), self.ds.key_tag)
 
     def serialize(self, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=True):
-        d = OrderedDict()
+        warnings = self.warnings
+        errors = self.errors
+        d = {}
 
         erroneous_status = self.validation_status not in (DS_STATUS_VALID, DS_STATUS_INDETERMINATE_NO_DNSKEY, DS_STATUS_INDETERMINATE_UNKNOWN_ALGORITHM)
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                erroneous_status
+        show_id = erroneous_status or \
+                loglevel <= logging.INFO or \
+                (warnings and loglevel <= logging.WARNING) or \
+                (errors and loglevel <= logging.ERROR)
 
         if html_format:
             formatter = lambda x: escape(x, True)
@@ -514,14 +665,14 @@ class DSStatus(object):
             d['status'] = ds_status_mapping[self.validation_status]
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.ds_meta.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self.ds_meta.servers_sorted()
+            else:
+                servers = tuple_to_dict(self.ds_meta.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
@@ -542,101 +693,41 @@ class DSStatus(object):
             d['query_options'] = list(tags)
             d['query_options'].sort()
 
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+        if warnings and loglevel <= logging.WARNING:
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in warnings]
 
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+        if errors and loglevel <= logging.ERROR:
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in errors]
 
         return d
 
-class NSECStatus(object):
-    def __repr__(self):
-        return '<%s: "%s">' % (self.__class__.__name__, self.qname)
+class NSECStatusBase(object):
+    '''Common serialization for NSEC and NSEC3 proof statuses.  The pertinent
+    NSEC(3) records, overall status, servers, and any warnings and errors are
+    handled here; subclasses add the proof-specific detail via
+    _serialize_nsec_details().'''
 
-    def _get_wildcard(self, qname, nsec_rrset):
-        covering_name = nsec_rrset.name
-        next_name = nsec_rrset[0].next
-        for i in range(len(qname)):
-            j = -(i + 1)
-            if i < len(covering_name) and covering_name[j].lower() == qname[j].lower():
-                continue
-            elif i < len(next_name) and next_name[j].lower() == qname[j].lower():
-                continue
-            else:
-                break
-        return dns.name.Name(('*',) + qname[-i:])
+    __slots__ = ()
 
-class NSECStatusNXDOMAIN(NSECStatus):
-    def __init__(self, qname, rdtype, origin, is_zone, nsec_set_info):
-        self.qname = qname
-        self.origin = origin
-        self.is_zone = is_zone
-        self.warnings = []
-        self.errors = []
-
-        self.wildcard_name = None
-
-        self.nsec_names_covering_qname = {}
-        covering_names = nsec_set_info.nsec_covering_name(self.qname)
-        self.opt_out = None
-
-        if covering_names:
-            self.nsec_names_covering_qname[self.qname] = covering_names
-
-            covering_name = list(covering_names)[0]
-            self.wildcard_name = self._get_wildcard(qname, nsec_set_info.rrsets[covering_name].rrset)
+    _rr_id = None
+    _rr_key = None
 
-        self.nsec_names_covering_wildcard = {}
-        if self.wildcard_name is not None:
-            covering_names = nsec_set_info.nsec_covering_name(self.wildcard_name)
-            if covering_names:
-                self.nsec_names_covering_wildcard[self.wildcard_name] = covering_names
-
-        # check for covering of the origin
-        self.nsec_names_covering_origin = {}
-        covering_names = nsec_set_info.nsec_covering_name(self.origin)
-        if covering_names:
-            self.nsec_names_covering_origin[self.origin] = covering_names
-
-        self._set_validation_status(nsec_set_info)
-
-    def __eq__(self, other):
-        return isinstance(other, self.__class__) and \
-                self.qname == other.qname and self.origin == other.origin and self.nsec_set_info == other.nsec_set_info
-
-    def __hash__(self):
-        return hash(id(self))
-
-    def _set_validation_status(self, nsec_set_info):
-        self.validation_status = NSEC_STATUS_VALID
-        if not self.nsec_names_covering_qname:
-            self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.SnameNotCoveredNameError(sname=fmt.humanize_name(self.qname)))
-        if not self.nsec_names_covering_wildcard and self.wildcard_name is not None:
-            self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.WildcardNotCoveredNSEC(wildcard=fmt.humanize_name(self.wildcard_name)))
-        if self.nsec_names_covering_origin:
-            self.validation_status = NSEC_STATUS_INVALID
-            qname, nsec_names = list(self.nsec_names_covering_origin.items())[0]
-            nsec_rrset = nsec_set_info.rrsets[list(nsec_names)[0]].rrset
-            self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=fmt.humanize_name(nsec_rrset.name), next_name=fmt.humanize_name(nsec_rrset[0].next), zone_name=fmt.humanize_name(self.origin)))
-
-        # if it validation_status, we project out just the pertinent NSEC records
-        # otherwise clone it by projecting them all
-        if self.validation_status == NSEC_STATUS_VALID:
-            covering_names = set()
-            for names in list(self.nsec_names_covering_qname.values()) + list(self.nsec_names_covering_wildcard.values()):
-                covering_names.update(names)
-            self.nsec_set_info = nsec_set_info.project(*list(covering_names))
-        else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
-
-    def __str__(self):
-        return 'NSEC record(s) proving the non-existence (NXDOMAIN) of %s' % (fmt.humanize_name(self.qname))
+    def __repr__(self):
+        return '<%s: "%s">' % (self.__class__.__name__, self.qname)
 
     def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
-        d = OrderedDict()
+        warnings = self.warnings
+        errors = self.errors
+        # when serializing in bulk above INFO level with a valid status and
+        # nothing to report, the result is an empty dict; don't bother
+        # walking the NSEC(3) records
+        if rrset_info_serializer is None and loglevel > logging.INFO and \
+                self.validation_status == STATUS_VALID and \
+                not (warnings and loglevel <= logging.WARNING) and \
+                not (errors and loglevel <= logging.ERROR):
+            return {}
+
+        d = {}
 
         nsec_list = []
         for nsec_rrset in self.nsec_set_info.rrsets.values():
@@ -649,10 +740,10 @@ class NSECStatusNXDOMAIN(NSECStatus):
 
         erroneous_status = self.validation_status != STATUS_VALID
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                (erroneous_status or nsec_list)
+        show_id = (erroneous_status or nsec_list) or \
+                loglevel <= logging.INFO or \
+                (warnings and loglevel <= logging.WARNING) or \
+                (errors and loglevel <= logging.ERROR)
 
         if html_format:
             formatter = lambda x: escape(x, True)
@@ -660,46 +751,29 @@ class NSECStatusNXDOMAIN(NSECStatus):
             formatter = lambda x: x
 
         if show_id:
-            d['id'] = 'NSEC'
+            d['id'] = self._rr_id
 
         if loglevel <= logging.DEBUG:
             d['description'] = formatter(str(self))
 
         if nsec_list:
-            d['nsec'] = nsec_list
+            d[self._rr_key] = nsec_list
 
         if loglevel <= logging.DEBUG:
-            if self.nsec_names_covering_qname:
-                qname, nsec_names = list(self.nsec_names_covering_qname.items())[0]
-                nsec_name = list(nsec_names)[0]
-                nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
-                d['sname_covering'] = OrderedDict((
-                    ('covered_name', formatter(lb2s(qname.canonicalize().to_text()))),
-                    ('nsec_owner', formatter(lb2s(nsec_name.canonicalize().to_text()))),
-                    ('nsec_next', formatter(lb2s(nsec_rr.next.canonicalize().to_text())))
-                ))
-                if self.nsec_names_covering_wildcard:
-                    wildcard, nsec_names = list(self.nsec_names_covering_wildcard.items())[0]
-                    nsec_name = list(nsec_names)[0]
-                    nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
-                    d['wildcard_covering'] = OrderedDict((
-                        ('covered_name', formatter(lb2s(wildcard.canonicalize().to_text()))),
-                        ('nsec_owner', formatter(lb2s(nsec_name.canonicalize().to_text()))),
-                        ('nsec_next', formatter(lb2s(nsec_rr.next.canonicalize().to_text())))
-                    ))
+            self._serialize_nsec_details(d, formatter)
 
         if loglevel <= logging.INFO or erroneous_status:
             d['status'] = nsec_status_mapping[self.validation_status]
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.nsec_set_info.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self.nsec_set_info.servers_sorted()
+            else:
+                servers = tuple_to_dict(self.nsec_set_info.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
@@ -720,15 +794,132 @@ class NSECStatusNXDOMAIN(NSECStatus):
             d['query_options'] = list(tags)
             d['query_options'].sort()
 
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+        if warnings and loglevel <= logging.WARNING:
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in warnings]
 
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+        if errors and loglevel <= logging.ERROR:
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in errors]
 
         return d
 
+class NSECStatus(NSECStatusBase):
+    __slots__ = ()
+
+    _rr_id = 'NSEC'
+    _rr_key = 'nsec'
+
+    def _get_wildcard(self, qname, nsec_rrset):
+        covering_name = nsec_rrset.name
+        next_name = nsec_rrset[0].next
+        for i in range(len(qname)):
+            j = -(i + 1)
+            if i < len(covering_name) and covering_name[j].lower() == qname[j].lower():
+                continue
+            elif i < len(next_name) and next_name[j].lower() == qname[j].lower():
+                continue
+            else:
+                break
+        return _intern_name(dns.name.Name(STAR + qname[-i:]))
+
+class NSECStatusNXDOMAIN(NSECStatus):
+    __slots__ = ('qname', 'origin', 'is_zone', 'warnings', 'errors',
+            'wildcard_name', 'nsec_covering_qname', 'opt_out',
+            'nsec_covering_wildcard', 'nsec_covering_origin',
+            'validation_status', 'nsec_set_info')
+
+    def __init__(self, qname, rdtype, origin, is_zone, nsec_set_info):
+        self.qname = qname
+        self.origin = origin
+        self.is_zone = is_zone
+        self.warnings = []
+        self.errors = []
+
+        self.wildcard_name = None
+
+        # each of the following is a (name, covering_nsec_names) tuple, or
+        # None, if nothing covers the name
+        self.nsec_covering_qname = None
+        covering_names = nsec_set_info.nsec_covering_name(self.qname)
+        self.opt_out = None
+
+        if covering_names:
+            self.nsec_covering_qname = (self.qname, covering_names)
+
+            covering_name = next(iter(covering_names))
+            self.wildcard_name = self._get_wildcard(qname, nsec_set_info.rrsets[covering_name].rrset)
+
+        self.nsec_covering_wildcard = None
+        if self.wildcard_name is not None:
+            covering_names = nsec_set_info.nsec_covering_name(self.wildcard_name)
+            if covering_names:
+                self.nsec_covering_wildcard = (self.wildcard_name, covering_names)
+
+        # check for covering of the origin
+        self.nsec_covering_origin = None
+        covering_names = nsec_set_info.nsec_covering_name(self.origin)
+        if covering_names:
+            self.nsec_covering_origin = (self.origin, covering_names)
+
+        self._set_validation_status(nsec_set_info)
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and \
+                self.qname == other.qname and self.origin == other.origin and self.nsec_set_info == other.nsec_set_info
+
+    def __hash__(self):
+        return hash(id(self))
+
+    def _set_validation_status(self, nsec_set_info):
+        self.validation_status = NSEC_STATUS_VALID
+        if self.nsec_covering_qname is None:
+            self.validation_status = NSEC_STATUS_INVALID
+            self.errors.append(Errors.SnameNotCoveredNameError(sname=self.qname))
+        if self.nsec_covering_wildcard is None and self.wildcard_name is not None:
+            self.validation_status = NSEC_STATUS_INVALID
+            self.errors.append(Errors.WildcardNotCoveredNSEC(wildcard=self.wildcard_name))
+        if self.nsec_covering_origin is not None:
+            self.validation_status = NSEC_STATUS_INVALID
+            qname, nsec_names = self.nsec_covering_origin
+            nsec_rrset = nsec_set_info.rrsets[next(iter(nsec_names))].rrset
+            self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=nsec_rrset.name, next_name=nsec_rrset[0].next, zone_name=self.origin))
+
+        # if it validation_status, we project out just the pertinent NSEC records
+        # otherwise clone it by projecting them all
+        if self.validation_status == NSEC_STATUS_VALID:
+            covering_names = set()
+            for covering in (self.nsec_covering_qname, self.nsec_covering_wildcard):
+                if covering is not None:
+                    covering_names.update(covering[1])
+            self.nsec_set_info = nsec_set_info.project(*covering_names)
+        else:
+            self.nsec_set_info = nsec_set_info.copy()
+
+    def __str__(self):
+        return 'NSEC record(s) proving the non-existence (NXDOMAIN) of %s' % (_human_text(self.qname))
+
+    def _serialize_nsec_details(self, d, formatter):
+        if self.nsec_covering_qname is not None:
+            qname, nsec_names = self.nsec_covering_qname
+            nsec_name = next(iter(nsec_names))
+            nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
+            d['sname_covering'] = {
+                'covered_name': formatter(_canon_text(qname)),
+                'nsec_owner': formatter(_canon_text(nsec_name)),
+                'nsec_next': formatter(_canon_text(nsec_rr.next)),
+            }
+            if self.nsec_covering_wildcard is not None:
+                wildcard, nsec_names = self.nsec_covering_wildcard
+                nsec_name = next(iter(nsec_names))
+                nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
+                d['wildcard_covering'] = {
+                    'covered_name': formatter(_canon_text(wildcard)),
+                    'nsec_owner': formatter(_canon_text(nsec_name)),
+                    'nsec_next': formatter(_canon_text(nsec_rr.next)),
+                }
+
 class NSECStatusWildcard(NSECStatusNXDOMAIN):
+    __slots__ = ('wildcard_name_from_rrsig',)
+
     def __init__(self, qname, wildcard_name, rdtype, origin, is_zone, nsec_set_info):
         self.wildcard_name_from_rrsig = wildcard_name
         super(NSECStatusWildcard, self).__init__(qname, rdtype, origin, is_zone, nsec_set_info)
@@ -741,39 +932,39 @@ class NSECStatusWildcard(NSECStatusNXDOMAIN):
         return hash(id(self))
 
     def _next_closest_encloser(self):
-        return dns.name.Name(self.qname.labels[-len(self.wildcard_name):])
+        return _intern_name(dns.name.Name(self.qname.labels[-len(self.wildcard_name):]))
 
     def _set_validation_status(self, nsec_set_info):
         self.validation_status = NSEC_STATUS_VALID
-        if self.nsec_names_covering_qname:
+        if self.nsec_covering_qname is not None:
             next_closest_encloser = self._next_closest_encloser()
             nsec_covering_next_closest_encloser = nsec_set_info.nsec_covering_name(next_closest_encloser)
             if not nsec_covering_next_closest_encloser:
                 self.validation_status = NSEC_STATUS_INVALID
-                self.errors.append(Errors.WildcardExpansionInvalid(sname=fmt.humanize_name(self.qname), wildcard=fmt.humanize_name(self.wildcard_name), next_closest_encloser=fmt.humanize_name(next_closest_encloser)))
+                self.errors.append(Errors.WildcardExpansionInvalid(sname=self.qname, wildcard=self.wildcard_name, next_closest_encloser=next_closest_encloser))
         else:
             self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.SnameNotCoveredWildcardAnswer(sname=fmt.humanize_name(self.qname)))
+            self.errors.append(Errors.SnameNotCoveredWildcardAnswer(sname=self.qname))
 
-        if self.nsec_names_covering_wildcard:
+        if self.nsec_covering_wildcard is not None:
             self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.WildcardCoveredAnswerNSEC(wildcard=fmt.humanize_name(self.wildcard_name)))
+            self.errors.append(Errors.WildcardCoveredAnswerNSEC(wildcard=self.wildcard_name))
 
-        if self.nsec_names_covering_origin:
+        if self.nsec_covering_origin is not None:
             self.validation_status = NSEC_STATUS_INVALID
-            qname, nsec_names = list(self.nsec_names_covering_origin.items())[0]
-            nsec_rrset = nsec_set_info.rrsets[list(nsec_names)[0]].rrset
-            self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=fmt.humanize_name(nsec_rrset.name), next_name=fmt.humanize_name(nsec_rrset[0].next), zone_name=fmt.humanize_name(self.origin)))
+            qname, nsec_names = self.nsec_covering_origin
+            nsec_rrset = nsec_set_info.rrsets[next(iter(nsec_names))].rrset
+            self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=nsec_rrset.name, next_name=nsec_rrset[0].next, zone_name=self.origin))
 
         # if it validation_status, we project out just the pertinent NSEC records
         # otherwise clone it by projecting them all
         if self.validation_status == NSEC_STATUS_VALID:
             covering_names = set()
-            for names in self.nsec_names_covering_qname.values():
-                covering_names.update(names)
-            self.nsec_set_info = nsec_set_info.project(*list(covering_names))
+            if self.nsec_covering_qname is not None:
+                covering_names.update(self.nsec_covering_qname[1])
+            self.nsec_set_info = nsec_set_info.project(*covering_names)
         else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
+            self.nsec_set_info = nsec_set_info.copy()
 
     def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
         d = super(NSECStatusWildcard, self).serialize(rrset_info_serializer, consolidate_clients=consolidate_clients, loglevel=loglevel, html_format=html_format, map_ip_to_ns_name=map_ip_to_ns_name)
@@ -784,6 +975,13 @@ class NSECStatusWildcard(NSECStatusNXDOMAIN):
         return d
 
 class NSECStatusNODATA(NSECStatus):
+    __slots__ = ('qname', 'rdtype', 'origin', 'is_zone', 'referral',
+            'warnings', 'errors', 'wildcard_name', 'nsec_for_qname',
+            'has_rdtype', 'has_ns', 'has_ds', 'has_soa',
+            'nsec_covering_qname', 'nsec_for_wildcard_name',
+            'wildcard_has_rdtype', 'nsec_covering_origin', 'opt_out',
+            'validation_status', 'nsec_set_info')
+
     def __init__(self, qname, rdtype, origin, is_zone, nsec_set_info, sname_must_match=False):
         self.qname = qname
         self.rdtype = rdtype
@@ -797,10 +995,11 @@ class NSECStatusNODATA(NSECStatus):
 
         try:
             self.nsec_for_qname = nsec_set_info.rrsets[self.qname]
-            self.has_rdtype = nsec_set_info.rdtype_exists_in_bitmap(self.qname, self.rdtype)
-            self.has_ns = nsec_set_info.rdtype_exists_in_bitmap(self.qname, dns.rdatatype.NS)
-            self.has_ds = nsec_set_info.rdtype_exists_in_bitmap(self.qname, dns.rdatatype.DS)
-            self.has_soa = nsec_set_info.rdtype_exists_in_bitmap(self.qname, dns.rdatatype.SOA)
+            types_in_bitmap = nsec_set_info.rdtypes_exist_in_bitmap(self.qname, (self.rdtype, _RDT_NS, _RDT_DS, _RDT_SOA))
+            self.has_rdtype = self.rdtype in types_in_bitmap
+            self.has_ns = _RDT_NS in types_in_bitmap
+            self.has_ds = _RDT_DS in types_in_bitmap
+            self.has_soa = _RDT_SOA in types_in_bitmap
         except KeyError:
             self.nsec_for_qname = None
             self.has_rdtype = False
@@ -811,18 +1010,20 @@ class NSECStatusNODATA(NSECStatus):
             if not sname_must_match:
                 # If no NSEC exists for the name itself, then look for an NSEC with
                 # an (empty non-terminal) ancestor
-                for nsec_name in nsec_set_info.rrsets:
-                    next_name = nsec_set_info.rrsets[nsec_name].rrset[0].next
+                for nsec_name, nsec_rrset_info in nsec_set_info.rrsets.items():
+                    next_name = nsec_rrset_info.rrset[0].next
                     if next_name.is_subdomain(self.qname) and next_name != self.qname:
-                        self.nsec_for_qname = nsec_set_info.rrsets[nsec_name]
+                        self.nsec_for_qname = nsec_rrset_info
                         break
 
-        self.nsec_names_covering_qname = {}
+        # a (name, covering_nsec_names) tuple, or None, if nothing covers
+        # the name
+        self.nsec_covering_qname = None
         covering_names = nsec_set_info.nsec_covering_name(self.qname)
         if covering_names:
-            self.nsec_names_covering_qname[self.qname] = covering_names
+            self.nsec_covering_qname = (self.qname, covering_names)
 
-            covering_name = list(covering_names)[0]
+            covering_name = next(iter(covering_names))
             self.wildcard_name = self._get_wildcard(qname, nsec_set_info.rrsets[covering_name].rrset)
 
         self.nsec_for_wildcard_name = None
@@ -835,17 +1036,17 @@ class NSECStatusNODATA(NSECStatus):
                 pass
 
         # check for covering of the origin
-        self.nsec_names_covering_origin = {}
+        self.nsec_covering_origin = None
         covering_names = nsec_set_info.nsec_covering_name(self.origin)
         if covering_names:
-            self.nsec_names_covering_origin[self.origin] = covering_names
+            self.nsec_covering_origin = (self.origin, covering_names)
 
         self.opt_out = None
 
         self._set_validation_status(nsec_set_info)
 
     def __str__(self):
-        return 'NSEC record(s) proving non-existence (NODATA) of %s/%s' % (fmt.humanize_name(self.qname), dns.rdatatype.to_text(self.rdtype))
+        return 'NSEC record(s) proving non-existence (NODATA) of %s/%s' % (_human_text(self.qname), _rdt_to_text(self.rdtype))
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and \
@@ -856,37 +1057,38 @@ class NSECStatusNODATA(NSECStatus):
 
     def _set_validation_status(self, nsec_set_info):
         self.validation_status = NSEC_STATUS_VALID
+        stype_text = _rdt_to_text(self.rdtype)
         if self.nsec_for_qname is not None:
             # RFC 4034 5.2, 6840 4.4
-            if self.rdtype == dns.rdatatype.DS or self.referral:
+            if self.rdtype == _RDT_DS or self.referral:
                 if self.is_zone and not self.has_ns:
-                    self.errors.append(Errors.ReferralWithoutNSBitNSEC(sname=fmt.humanize_name(self.qname)))
+                    self.errors.append(Errors.ReferralWithoutNSBitNSEC(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
                 if self.has_ds:
-                    self.errors.append(Errors.ReferralWithDSBitNSEC(sname=fmt.humanize_name(self.qname)))
+                    self.errors.append(Errors.ReferralWithDSBitNSEC(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
                 if self.has_soa:
-                    self.errors.append(Errors.ReferralWithSOABitNSEC(sname=fmt.humanize_name(self.qname)))
+                    self.errors.append(Errors.ReferralWithSOABitNSEC(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
             else:
                 if self.has_rdtype:
-                    self.errors.append(Errors.StypeInBitmapNODATANSEC(sname=fmt.humanize_name(self.qname), stype=dns.rdatatype.to_text(self.rdtype)))
+                    self.errors.append(Errors.StypeInBitmapNODATANSEC(sname=self.qname, stype=stype_text))
                     self.validation_status = NSEC_STATUS_INVALID
-            if self.nsec_names_covering_qname:
-                self.errors.append(Errors.SnameCoveredNODATANSEC(sname=fmt.humanize_name(self.qname)))
+            if self.nsec_covering_qname is not None:
+                self.errors.append(Errors.SnameCoveredNODATANSEC(sname=self.qname))
                 self.validation_status = NSEC_STATUS_INVALID
-        elif self.nsec_for_wildcard_name: # implies wildcard_name, which implies nsec_names_covering_qname
+        elif self.nsec_for_wildcard_name: # implies wildcard_name, which implies nsec_covering_qname
             if self.wildcard_has_rdtype:
                 self.validation_status = NSEC_STATUS_INVALID
-                self.errors.append(Errors.StypeInBitmapNODATANSEC(sname=fmt.humanize_name(self.wildcard_name), stype=dns.rdatatype.to_text(self.rdtype)))
-            if self.nsec_names_covering_origin:
+                self.errors.append(Errors.StypeInBitmapNODATANSEC(sname=self.wildcard_name, stype=stype_text))
+            if self.nsec_covering_origin is not None:
                 self.validation_status = NSEC_STATUS_INVALID
-                qname, nsec_names = list(self.nsec_names_covering_origin.items())[0]
-                nsec_rrset = nsec_set_info.rrsets[list(nsec_names)[0]].rrset
-                self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=fmt.humanize_name(nsec_rrset.name), next_name=fmt.humanize_name(nsec_rrset[0].next), zone_name=fmt.humanize_name(self.origin)))
+                qname, nsec_names = self.nsec_covering_origin
+                nsec_rrset = nsec_set_info.rrsets[next(iter(nsec_names))].rrset
+                self.errors.append(Errors.LastNSECNextNotZone(nsec_owner=nsec_rrset.name, next_name=nsec_rrset[0].next, zone_name=self.origin))
         else:
             self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.NoNSECMatchingSnameNODATA(sname=fmt.humanize_name(self.qname)))
+            self.errors.append(Errors.NoNSECMatchingSnameNODATA(sname=self.qname))
 
         # if it validation_status, we project out just the pertinent NSEC records
         # otherwise clone it by projecting them all
@@ -894,128 +1096,90 @@ class NSECStatusNODATA(NSECStatus):
             covering_names = set()
             if self.nsec_for_qname is not None:
                 covering_names.add(self.nsec_for_qname.rrset.name)
-            if self.nsec_names_covering_qname:
-                for names in self.nsec_names_covering_qname.values():
-                    covering_names.update(names)
+            if self.nsec_covering_qname is not None:
+                covering_names.update(self.nsec_covering_qname[1])
             if self.nsec_for_wildcard_name is not None:
                 covering_names.add(self.wildcard_name)
-            self.nsec_set_info = nsec_set_info.project(*list(covering_names))
+            self.nsec_set_info = nsec_set_info.project(*covering_names)
         else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
+            self.nsec_set_info = nsec_set_info.copy()
 
-    def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
-        d = OrderedDict()
+    def _serialize_nsec_details(self, d, formatter):
+        if self.nsec_for_qname is not None:
+            d['sname_nsec_match'] = formatter(_canon_text(self.nsec_for_qname.rrset.name))
+
+        if self.nsec_covering_qname is not None:
+            qname, nsec_names = self.nsec_covering_qname
+            nsec_name = next(iter(nsec_names))
+            nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
+            d['sname_covering'] = {
+                'covered_name': formatter(_canon_text(qname)),
+                'nsec_owner': formatter(_canon_text(nsec_name)),
+                'nsec_next': formatter(_canon_text(nsec_rr.next)),
+            }
 
-        nsec_list = []
-        for nsec_rrset in self.nsec_set_info.rrsets.values():
-            if rrset_info_serializer is not None:
-                nsec_serialized = rrset_info_serializer(nsec_rrset, consolidate_clients=consolidate_clients, show_servers=False, loglevel=loglevel, html_format=html_format)
-                if nsec_serialized:
-                    nsec_list.append(nsec_serialized)
-            elif loglevel <= logging.DEBUG:
-                nsec_list.append(nsec_rrset.serialize(consolidate_clients=consolidate_clients, html_format=html_format))
+            if self.nsec_for_wildcard_name is not None:
+                d['wildcard_nsec_match'] = formatter(_canon_text(self.wildcard_name))
 
-        erroneous_status = self.validation_status != STATUS_VALID
+class NSEC3Status(NSECStatusBase):
+    __slots__ = ()
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                (erroneous_status or nsec_list)
+    _rr_id = 'NSEC3'
+    _rr_key = 'nsec3'
 
-        if html_format:
-            formatter = lambda x: escape(x, True)
+    def _first_digest_name(self, name):
+        # the first digest recorded for the name: the dummy entry filled in
+        # for an inferred closest encloser takes precedence, since it was
+        # inserted before the per-parameter digests were computed
+        try:
+            return self.name_digest_map[name, None]
+        except KeyError:
+            pass
+        try:
+            return self.name_digest_map[name, self._first_params]
+        except KeyError:
+            # with multiple NSEC3 parameter sets, a name's digest might only
+            # have been computed under a later set; the map preserves
+            # insertion order, so the first matching entry is the first digest
+            # recorded for the name
+            for (n, params), digest_name in self.name_digest_map.items():
+                if n == name:
+                    return digest_name
+            raise
+
+    def _set_first_encloser(self):
+        # cache the (encloser_name, nsec_names) representative consulted by
+        # the accessors and serializers; the mapping never changes once the
+        # object is built
+        if self.closest_encloser:
+            self._first_encloser = next(iter(self.closest_encloser.items()))
+            self._next_closest_encloser = self._get_next_closest_encloser(self._first_encloser[0])
         else:
-            formatter = lambda x: x
-
-        if show_id:
-            d['id'] = 'NSEC'
-
-        if loglevel <= logging.DEBUG:
-            d['description'] = formatter(str(self))
-
-        if nsec_list:
-            d['nsec'] = nsec_list
-
-        if loglevel <= logging.DEBUG:
-            if self.nsec_for_qname is not None:
-                d['sname_nsec_match'] = formatter(lb2s(self.nsec_for_qname.rrset.name.canonicalize().to_text()))
-
-            if self.nsec_names_covering_qname:
-                qname, nsec_names = list(self.nsec_names_covering_qname.items())[0]
-                nsec_name = list(nsec_names)[0]
-                nsec_rr = self.nsec_set_info.rrsets[nsec_name].rrset[0]
-                d['sname_covering'] = OrderedDict((
-                    ('covered_name', formatter(lb2s(qname.canonicalize().to_text()))),
-                    ('nsec_owner', formatter(lb2s(nsec_name.canonicalize().to_text()))),
-                    ('nsec_next', formatter(lb2s(nsec_rr.next.canonicalize().to_text())))
-                ))
-
-                if self.nsec_for_wildcard_name is not None:
-                    d['wildcard_nsec_match'] = formatter(lb2s(self.wildcard_name.canonicalize().to_text()))
-
-        if loglevel <= logging.INFO or erroneous_status:
-            d['status'] = nsec_status_mapping[self.validation_status]
-
-        if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.nsec_set_info.servers_clients)
-            if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
-            d['servers'] = servers
-
-            if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
-                ns_names.sort()
-                d['ns_names'] = ns_names
-
-            tags = set()
-            nsids = set()
-            for server,client in self.nsec_set_info.servers_clients:
-                for response in self.nsec_set_info.servers_clients[(server, client)]:
-                    if response is not None:
-                        tags.add(response.effective_query_tag())
-                        nsid = response.nsid_val()
-                        if nsid is not None:
-                            nsids.add(nsid)
-
-            if nsids:
-                d['nsid_values'] = list(nsids)
-                d['nsid_values'].sort()
-
-            d['query_options'] = list(tags)
-            d['query_options'].sort()
-
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
-
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
-
-        return d
-
-class NSEC3Status(object):
-    def __repr__(self):
-        return '<%s: "%s">' % (self.__class__.__name__, self.qname)
+            self._first_encloser = (None, None)
+            self._next_closest_encloser = None
 
     def _get_next_closest_encloser(self, encloser):
-        return dns.name.Name(self.qname.labels[-(len(encloser)+1):])
+        return _intern_name(dns.name.Name(self.qname.labels[-(len(encloser)+1):]))
 
     def get_next_closest_encloser(self):
-        if self.closest_encloser:
-            encloser_name, nsec_names = list(self.closest_encloser.items())[0]
-            return self._get_next_closest_encloser(encloser_name)
-        return None
+        return self._next_closest_encloser
 
     def _get_wildcard(self, encloser):
-        return dns.name.from_text('*', encloser)
+        return _wildcard_for(encloser)
 
     def get_wildcard(self):
-        if self.closest_encloser:
-            encloser_name, nsec_names = list(self.closest_encloser.items())[0]
+        encloser_name = self._first_encloser[0]
+        if encloser_name is not None:
             return self._get_wildcard(encloser_name)
         return None
 
 class NSEC3StatusNXDOMAIN(NSEC3Status):
+    __slots__ = ('qname', 'origin', 'is_zone', 'warnings', 'errors',
+            'name_digest_map', '_first_params', '_first_encloser',
+            '_next_closest_encloser', 'closest_encloser',
+            'nsec_names_covering_qname', 'nsec_names_covering_wildcard',
+            'opt_out', 'validation_status', 'nsec_set_info')
+
     def __init__(self, qname, rdtype, origin, is_zone, nsec_set_info):
         self.qname = qname
         self.origin = origin
@@ -1024,8 +1188,10 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
         self.errors = []
 
         self.name_digest_map = {}
+        self._first_params = next(iter(nsec_set_info.nsec3_params), None)
 
         self._set_closest_encloser(nsec_set_info)
+        self._set_first_encloser()
 
         self.nsec_names_covering_qname = {}
         self.nsec_names_covering_wildcard = {}
@@ -1033,15 +1199,13 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
 
         for (salt, alg, iterations), nsec3_names in nsec_set_info.nsec3_params.items():
             digest_name = nsec_set_info.get_digest_name_for_nsec3(self.qname, self.origin, salt, alg, iterations)
-            if self.qname not in self.name_digest_map:
-                self.name_digest_map[self.qname] = {}
-            self.name_digest_map[self.qname][(salt, alg, iterations)] = digest_name
+            self.name_digest_map[self.qname, (salt, alg, iterations)] = digest_name
 
         for encloser in self.closest_encloser:
             next_closest_encloser = self._get_next_closest_encloser(encloser)
             for salt, alg, iterations in nsec_set_info.nsec3_params:
                 try:
-                    digest_name = self.name_digest_map[next_closest_encloser][(salt, alg, iterations)]
+                    digest_name = self.name_digest_map[next_closest_encloser, (salt, alg, iterations)]
                 except KeyError:
                     digest_name = nsec_set_info.get_digest_name_for_nsec3(next_closest_encloser, self.origin, salt, alg, iterations)
 
@@ -1054,9 +1218,7 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
                             if nsec_set_info.rrsets[nsec_name].rrset[0].flags & 0x01:
                                 self.opt_out = True
 
-                if next_closest_encloser not in self.name_digest_map:
-                    self.name_digest_map[next_closest_encloser] = {}
-                self.name_digest_map[next_closest_encloser][(salt, alg, iterations)] = digest_name
+                self.name_digest_map[next_closest_encloser, (salt, alg, iterations)] = digest_name
 
                 wildcard_name = self._get_wildcard(encloser)
                 digest_name = nsec_set_info.get_digest_name_for_nsec3(wildcard_name, self.origin, salt, alg, iterations)
@@ -1066,14 +1228,12 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
                     if covering_names:
                         self.nsec_names_covering_wildcard[digest_name] = covering_names
 
-                if wildcard_name not in self.name_digest_map:
-                    self.name_digest_map[wildcard_name] = {}
-                self.name_digest_map[wildcard_name][(salt, alg, iterations)] = digest_name
+                self.name_digest_map[wildcard_name, (salt, alg, iterations)] = digest_name
 
         self._set_validation_status(nsec_set_info)
 
     def __str__(self):
-        return 'NSEC3 record(s) proving the non-existence (NXDOMAIN) of %s' % (fmt.humanize_name(self.qname))
+        return 'NSEC3 record(s) proving the non-existence (NXDOMAIN) of %s' % (_human_text(self.qname))
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and \
@@ -1089,13 +1249,13 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
         self.validation_status = NSEC_STATUS_VALID
         valid_algs, invalid_algs = nsec_set_info.get_algorithm_support()
         if invalid_algs:
-            invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=list(invalid_algs)[0])
+            invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=next(iter(invalid_algs)))
         else:
             invalid_alg_err = None
         if not self.closest_encloser:
             self.validation_status = NSEC_STATUS_INVALID
             if valid_algs:
-                self.errors.append(Errors.NoClosestEncloserNameError(sname=fmt.humanize_name(self.qname)))
+                self.errors.append(Errors.NoClosestEncloserNameError(sname=self.qname))
             if invalid_algs:
                 self.errors.append(invalid_alg_err)
         else:
@@ -1103,14 +1263,14 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
                 self.validation_status = NSEC_STATUS_INVALID
                 if valid_algs:
                     next_closest_encloser = self.get_next_closest_encloser()
-                    self.errors.append(Errors.NextClosestEncloserNotCoveredNameError(next_closest_encloser=fmt.humanize_name(next_closest_encloser)))
+                    self.errors.append(Errors.NextClosestEncloserNotCoveredNameError(next_closest_encloser=next_closest_encloser))
                 if invalid_algs:
                     self.errors.append(invalid_alg_err)
             if not self.nsec_names_covering_wildcard:
                 self.validation_status = NSEC_STATUS_INVALID
                 if valid_algs:
                     wildcard_name = self.get_wildcard()
-                    self.errors.append(Errors.WildcardNotCoveredNSEC3(wildcard=fmt.humanize_name(wildcard_name)))
+                    self.errors.append(Errors.WildcardNotCoveredNSEC3(wildcard=wildcard_name))
                 if invalid_algs and invalid_alg_err not in self.errors:
                     self.errors.append(invalid_alg_err)
 
@@ -1118,146 +1278,66 @@ class NSEC3StatusNXDOMAIN(NSEC3Status):
         # otherwise clone it by projecting them all
         if self.validation_status == NSEC_STATUS_VALID:
             covering_names = set()
-            for names in list(self.closest_encloser.values()) + list(self.nsec_names_covering_qname.values()) + list(self.nsec_names_covering_wildcard.values()):
+            for names in itertools.chain(self.closest_encloser.values(), self.nsec_names_covering_qname.values(), self.nsec_names_covering_wildcard.values()):
                 covering_names.update(names)
-            self.nsec_set_info = nsec_set_info.project(*list(covering_names))
+            self.nsec_set_info = nsec_set_info.project(*covering_names)
         else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
+            self.nsec_set_info = nsec_set_info.copy()
 
         # Report errors with NSEC3 owner names
         for name in self.nsec_set_info.invalid_nsec3_owner:
-            self.errors.append(Errors.InvalidNSEC3OwnerName(name=fmt.format_nsec3_name(name)))
+            self.errors.append(Errors.InvalidNSEC3OwnerName(name=_fmt_nsec3(name)))
         for name in self.nsec_set_info.invalid_nsec3_hash:
-            self.errors.append(Errors.InvalidNSEC3Hash(name=fmt.format_nsec3_name(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
-
-    def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
-        d = OrderedDict()
+            self.errors.append(Errors.InvalidNSEC3Hash(name=_fmt_nsec3(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
 
-        nsec3_list = []
-        for nsec_rrset in self.nsec_set_info.rrsets.values():
-            if rrset_info_serializer is not None:
-                nsec_serialized = rrset_info_serializer(nsec_rrset, consolidate_clients=consolidate_clients, show_servers=False, loglevel=loglevel, html_format=html_format)
-                if nsec_serialized:
-                    nsec3_list.append(nsec_serialized)
-            elif loglevel <= logging.DEBUG:
-                nsec3_list.append(nsec_rrset.serialize(consolidate_clients=consolidate_clients, html_format=html_format))
+    def _serialize_nsec_details(self, d, formatter):
+        if self.opt_out is not None:
+            d['opt_out'] = self.opt_out
 
-        erroneous_status = self.validation_status != STATUS_VALID
+        if self.closest_encloser:
+            encloser_name, nsec_names = self._first_encloser
+            nsec_name = next(iter(nsec_names))
+            d['closest_encloser'] = formatter(_canon_text(encloser_name))
+            # could be inferred from wildcard
+            if nsec_name is not None:
+                d['closest_encloser_hash'] = formatter(_fmt_nsec3(nsec_name))
+
+            next_closest_encloser = self._next_closest_encloser
+            d['next_closest_encloser'] = formatter(_canon_text(next_closest_encloser))
+            digest_name = self._first_digest_name(next_closest_encloser)
+            d['next_closest_encloser_hash'] = formatter(_fmt_nsec3(digest_name)) if digest_name is not None else None
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                (erroneous_status or nsec3_list)
+            if self.nsec_names_covering_qname:
+                qname, nsec_names = next(iter(self.nsec_names_covering_qname.items()))
+                nsec_name = next(iter(nsec_names))
+                next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
+                d['next_closest_encloser_covering'] = {
+                    'covered_name': formatter(_fmt_nsec3(qname)),
+                    'nsec_owner': formatter(_fmt_nsec3(nsec_name)),
+                    'nsec_next': formatter(_fmt_nsec3(next_name)),
+                }
+
+            wildcard_name = self._get_wildcard(encloser_name)
+            wildcard_digest = self._first_digest_name(wildcard_name)
+            d['wildcard'] = formatter(_canon_text(wildcard_name))
+            d['wildcard_hash'] = formatter(_fmt_nsec3(wildcard_digest)) if wildcard_digest is not None else None
+            if self.nsec_names_covering_wildcard:
+                wildcard, nsec_names = next(iter(self.nsec_names_covering_wildcard.items()))
+                nsec_name = next(iter(nsec_names))
+                next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
+                d['wildcard_covering'] = {
+                    'covered_name': formatter(_fmt_nsec3(wildcard)),
+                    'nsec3_owner': formatter(_fmt_nsec3(nsec_name)),
+                    'nsec3_next': formatter(_fmt_nsec3(next_name)),
+                }
 
-        if html_format:
-            formatter = lambda x: escape(x, True)
         else:
-            formatter = lambda x: x
-
-        if show_id:
-            d['id'] = 'NSEC3'
-
-        if loglevel <= logging.DEBUG:
-            d['description'] = formatter(str(self))
-
-        if nsec3_list:
-            d['nsec3'] = nsec3_list
-
-        if loglevel <= logging.DEBUG:
-            if self.opt_out is not None:
-                d['opt_out'] = self.opt_out
-
-            if self.closest_encloser:
-                encloser_name, nsec_names = list(self.closest_encloser.items())[0]
-                nsec_name = list(nsec_names)[0]
-                d['closest_encloser'] = formatter(lb2s(encloser_name.canonicalize().to_text()))
-                # could be inferred from wildcard
-                if nsec_name is not None:
-                    d['closest_encloser_hash'] = formatter(fmt.format_nsec3_name(nsec_name))
-
-                next_closest_encloser = self._get_next_closest_encloser(encloser_name)
-                d['next_closest_encloser'] = formatter(lb2s(next_closest_encloser.canonicalize().to_text()))
-                digest_name = list(self.name_digest_map[next_closest_encloser].items())[0][1]
-                if digest_name is not None:
-                    d['next_closest_encloser_hash'] = formatter(fmt.format_nsec3_name(digest_name))
-                else:
-                    d['next_closest_encloser_hash'] = None
-
-                if self.nsec_names_covering_qname:
-                    qname, nsec_names = list(self.nsec_names_covering_qname.items())[0]
-                    nsec_name = list(nsec_names)[0]
-                    next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
-                    d['next_closest_encloser_covering'] = OrderedDict((
-                        ('covered_name', formatter(fmt.format_nsec3_name(qname))),
-                        ('nsec_owner', formatter(fmt.format_nsec3_name(nsec_name))),
-                        ('nsec_next', formatter(fmt.format_nsec3_name(next_name))),
-                    ))
-
-                wildcard_name = self._get_wildcard(encloser_name)
-                wildcard_digest = list(self.name_digest_map[wildcard_name].items())[0][1]
-                d['wildcard'] = formatter(lb2s(wildcard_name.canonicalize().to_text()))
-                if wildcard_digest is not None:
-                    d['wildcard_hash'] = formatter(fmt.format_nsec3_name(wildcard_digest))
-                else:
-                    d['wildcard_hash'] = None
-                if self.nsec_names_covering_wildcard:
-                    wildcard, nsec_names = list(self.nsec_names_covering_wildcard.items())[0]
-                    nsec_name = list(nsec_names)[0]
-                    next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
-                    d['wildcard_covering'] = OrderedDict((
-                        ('covered_name', formatter(fmt.format_nsec3_name(wildcard))),
-                        ('nsec3_owner', formatter(fmt.format_nsec3_name(nsec_name))),
-                        ('nsec3_next', formatter(fmt.format_nsec3_name(next_name))),
-                    ))
-
-            else:
-                digest_name = list(self.name_digest_map[self.qname].items())[0][1]
-                if digest_name is not None:
-                    d['sname_hash'] = formatter(fmt.format_nsec3_name(digest_name))
-                else:
-                    d['sname_hash'] = None
-
-        if loglevel <= logging.INFO or erroneous_status:
-            d['status'] = nsec_status_mapping[self.validation_status]
-
-        if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.nsec_set_info.servers_clients)
-            if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
-            d['servers'] = servers
-
-            if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
-                ns_names.sort()
-                d['ns_names'] = ns_names
-
-            tags = set()
-            nsids = set()
-            for server,client in self.nsec_set_info.servers_clients:
-                for response in self.nsec_set_info.servers_clients[(server, client)]:
-                    if response is not None:
-                        tags.add(response.effective_query_tag())
-                        nsid = response.nsid_val()
-                        if nsid is not None:
-                            nsids.add(nsid)
-
-            if nsids:
-                d['nsid_values'] = list(nsids)
-                d['nsid_values'].sort()
-
-            d['query_options'] = list(tags)
-            d['query_options'].sort()
-
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
-
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
-
-        return d
+            digest_name = self._first_digest_name(self.qname)
+            d['sname_hash'] = formatter(_fmt_nsec3(digest_name)) if digest_name is not None else None
 
 class NSEC3StatusWildcard(NSEC3StatusNXDOMAIN):
+    __slots__ = ('wildcard_name',)
+
     def __init__(self, qname, wildcard_name, rdtype, origin, is_zone, nsec_set_info):
         self.wildcard_name = wildcard_name
         super(NSEC3StatusWildcard, self).__init__(qname, rdtype, origin, is_zone, nsec_set_info)
@@ -1268,7 +1348,7 @@ class NSEC3StatusWildcard(NSEC3StatusNXDOMAIN):
         if not self.closest_encloser:
             self.closest_encloser = { self.wildcard_name.parent(): set([None]) }
             # fill in a dummy value for wildcard_name_digest_map
-            self.name_digest_map[self.wildcard_name] = { None: self.wildcard_name }
+            self.name_digest_map[self.wildcard_name, None] = self.wildcard_name
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and \
@@ -1283,34 +1363,34 @@ class NSEC3StatusWildcard(NSEC3StatusNXDOMAIN):
             self.validation_status = NSEC_STATUS_INVALID
             valid_algs, invalid_algs = nsec_set_info.get_algorithm_support()
             if invalid_algs:
-                invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=list(invalid_algs)[0])
+                invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=next(iter(invalid_algs)))
             else:
                 invalid_alg_err = None
             if valid_algs:
                 next_closest_encloser = self.get_next_closest_encloser()
-                self.errors.append(Errors.NextClosestEncloserNotCoveredWildcardAnswer(next_closest_encloser=fmt.humanize_name(next_closest_encloser)))
+                self.errors.append(Errors.NextClosestEncloserNotCoveredWildcardAnswer(next_closest_encloser=next_closest_encloser))
             if invalid_algs:
                 self.errors.append(invalid_alg_err)
 
         if self.nsec_names_covering_wildcard:
             self.validation_status = NSEC_STATUS_INVALID
-            self.errors.append(Errors.WildcardCoveredAnswerNSEC3(wildcard=fmt.humanize_name(self.wildcard_name)))
+            self.errors.append(Errors.WildcardCoveredAnswerNSEC3(wildcard=self.wildcard_name))
 
         # if it validation_status, we project out just the pertinent NSEC records
         # otherwise clone it by projecting them all
         if self.validation_status == NSEC_STATUS_VALID:
             covering_names = set()
-            for names in list(self.closest_encloser.values()) + list(self.nsec_names_covering_qname.values()):
+            for names in itertools.chain(self.closest_encloser.values(), self.nsec_names_covering_qname.values()):
                 covering_names.update(names)
             self.nsec_set_info = nsec_set_info.project(*[x for x in covering_names if x is not None])
         else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
+            self.nsec_set_info = nsec_set_info.copy()
 
         # Report errors with NSEC3 owner names
         for name in self.nsec_set_info.invalid_nsec3_owner:
-            self.errors.append(Errors.InvalidNSEC3OwnerName(name=fmt.format_nsec3_name(name)))
+            self.errors.append(Errors.InvalidNSEC3OwnerName(name=_fmt_nsec3(name)))
         for name in self.nsec_set_info.invalid_nsec3_hash:
-            self.errors.append(Errors.InvalidNSEC3Hash(name=fmt.format_nsec3_name(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
+            self.errors.append(Errors.InvalidNSEC3Hash(name=_fmt_nsec3(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
 
     def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
         d = super(NSEC3StatusWildcard, self).serialize(rrset_info_serializer, consolidate_clients=consolidate_clients, loglevel=loglevel, html_format=html_format, map_ip_to_ns_name=map_ip_to_ns_name)
@@ -1323,11 +1403,19 @@ class NSEC3StatusWildcard(NSEC3StatusNXDOMAIN):
         except KeyError:
             pass
         if loglevel <= logging.DEBUG:
-            if [x for x in list(self.closest_encloser.values())[0] if x is not None]:
+            if [x for x in self._first_encloser[1] if x is not None]:
                 d['superfluous_closest_encloser'] = True
         return d
 
 class NSEC3StatusNODATA(NSEC3Status):
+    __slots__ = ('qname', 'rdtype', 'origin', 'is_zone', 'referral',
+            'warnings', 'errors', 'wildcard_name', 'name_digest_map',
+            '_first_params', '_first_encloser', '_next_closest_encloser',
+            'closest_encloser', 'nsec_names_covering_qname',
+            'nsec_names_covering_wildcard', 'nsec_for_qname',
+            'nsec_for_wildcard_name', '_flags', 'opt_out',
+            'validation_status', 'nsec_set_info')
+
     def __init__(self, qname, rdtype, origin, is_zone, nsec_set_info):
         self.qname = qname
         self.rdtype = rdtype
@@ -1339,57 +1427,49 @@ class NSEC3StatusNODATA(NSEC3Status):
         self.errors = []
 
         self.name_digest_map = {}
+        self._first_params = next(iter(nsec_set_info.nsec3_params), None)
 
         self.closest_encloser = nsec_set_info.get_closest_encloser(qname, origin)
+        self._set_first_encloser()
 
         self.nsec_names_covering_qname = {}
         self.nsec_names_covering_wildcard = {}
         self.nsec_for_qname = set()
         self.nsec_for_wildcard_name = set()
-        self.has_rdtype = False
-        self.has_cname = False
-        self.has_ns = False
-        self.has_ds = False
-        self.has_soa = False
+        self._flags = 0
         self.opt_out = None
-        self.wildcard_has_rdtype = False
-        self.wildcard_has_cname = False
 
         for (salt, alg, iterations), nsec3_names in nsec_set_info.nsec3_params.items():
             digest_name = nsec_set_info.get_digest_name_for_nsec3(self.qname, self.origin, salt, alg, iterations)
-            if self.qname not in self.name_digest_map:
-                self.name_digest_map[self.qname] = {}
-            self.name_digest_map[self.qname][(salt, alg, iterations)] = digest_name
+            self.name_digest_map[self.qname, (salt, alg, iterations)] = digest_name
 
             for encloser in self.closest_encloser:
                 wildcard_name = self._get_wildcard(encloser)
                 digest_name = nsec_set_info.get_digest_name_for_nsec3(wildcard_name, self.origin, salt, alg, iterations)
                 if digest_name in nsec3_names:
                     self.nsec_for_wildcard_name.add(digest_name)
-                    if nsec_set_info.rdtype_exists_in_bitmap(digest_name, rdtype): self.wildcard_has_rdtype = True
-                    if nsec_set_info.rdtype_exists_in_bitmap(digest_name, dns.rdatatype.CNAME): self.wildcard_has_cname = True
+                    types_in_bitmap = nsec_set_info.rdtypes_exist_in_bitmap(digest_name, (rdtype, _RDT_CNAME))
+                    if rdtype in types_in_bitmap: self._flags |= _WILDCARD_HAS_RDTYPE
+                    if _RDT_CNAME in types_in_bitmap: self._flags |= _WILDCARD_HAS_CNAME
 
-                if wildcard_name not in self.name_digest_map:
-                    self.name_digest_map[wildcard_name] = {}
-                self.name_digest_map[wildcard_name][(salt, alg, iterations)] = digest_name
+                self.name_digest_map[wildcard_name, (salt, alg, iterations)] = digest_name
 
         for (salt, alg, iterations), nsec3_names in nsec_set_info.nsec3_params.items():
-            digest_name = self.name_digest_map[self.qname][(salt, alg, iterations)]
+            digest_name = self.name_digest_map[self.qname, (salt, alg, iterations)]
             if digest_name in nsec3_names:
                 self.nsec_for_qname.add(digest_name)
-                if nsec_set_info.rdtype_exists_in_bitmap(digest_name, rdtype): self.has_rdtype = True
-                if nsec_set_info.rdtype_exists_in_bitmap(digest_name, dns.rdatatype.CNAME): self.has_cname = True
-                if nsec_set_info.rdtype_exists_in_bitmap(digest_name, dns.rdatatype.NS): self.has_ns = True
-                if nsec_set_info.rdtype_exists_in_bitmap(digest_name, dns.rdatatype.DS): self.has_ds = True
-                if nsec_set_info.rdtype_exists_in_bitmap(digest_name, dns.rdatatype.SOA): self.has_soa = True
+                types_in_bitmap = nsec_set_info.rdtypes_exist_in_bitmap(digest_name, (rdtype, _RDT_CNAME, _RDT_NS, _RDT_DS, _RDT_SOA))
+                if rdtype in types_in_bitmap: self._flags |= _HAS_RDTYPE
+                if _RDT_CNAME in types_in_bitmap: self._flags |= _HAS_CNAME
+                if _RDT_NS in types_in_bitmap: self._flags |= _HAS_NS
+                if _RDT_DS in types_in_bitmap: self._flags |= _HAS_DS
+                if _RDT_SOA in types_in_bitmap: self._flags |= _HAS_SOA
 
             else:
                 for encloser in self.closest_encloser:
                     next_closest_encloser = self._get_next_closest_encloser(encloser)
                     digest_name = nsec_set_info.get_digest_name_for_nsec3(next_closest_encloser, self.origin, salt, alg, iterations)
-                    if next_closest_encloser not in self.name_digest_map:
-                        self.name_digest_map[next_closest_encloser] = {}
-                    self.name_digest_map[next_closest_encloser][(salt, alg, iterations)] = digest_name
+                    self.name_digest_map[next_closest_encloser, (salt, alg, iterations)] = digest_name
 
                     if digest_name is not None:
                         covering_names = nsec_set_info.nsec3_covering_name(digest_name, salt, alg, iterations)
@@ -1403,7 +1483,7 @@ class NSEC3StatusNODATA(NSEC3Status):
         self._set_validation_status(nsec_set_info)
 
     def __str__(self):
-        return 'NSEC3 record(s) proving non-existence (NODATA) of %s/%s' % (fmt.humanize_name(self.qname), dns.rdatatype.to_text(self.rdtype))
+        return 'NSEC3 record(s) proving non-existence (NODATA) of %s/%s' % (_human_text(self.qname), _rdt_to_text(self.rdtype))
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and \
@@ -1414,61 +1494,62 @@ class NSEC3StatusNODATA(NSEC3Status):
 
     def _set_validation_status(self, nsec_set_info):
         self.validation_status = NSEC_STATUS_VALID
+        stype_text = _rdt_to_text(self.rdtype)
         valid_algs, invalid_algs = nsec_set_info.get_algorithm_support()
         if invalid_algs:
-            invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=list(invalid_algs)[0])
+            invalid_alg_err = Errors.UnsupportedNSEC3Algorithm(algorithm=next(iter(invalid_algs)))
         else:
             invalid_alg_err = None
         if self.nsec_for_qname:
             # RFC 4035 5.2, 6840 4.4
-            if self.rdtype == dns.rdatatype.DS or self.referral:
-                if self.is_zone and not self.has_ns:
-                    self.errors.append(Errors.ReferralWithoutNSBitNSEC3(sname=fmt.humanize_name(self.qname)))
+            if self.rdtype == _RDT_DS or self.referral:
+                if self.is_zone and not self._flags & _HAS_NS:
+                    self.errors.append(Errors.ReferralWithoutNSBitNSEC3(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
-                if self.has_ds:
-                    self.errors.append(Errors.ReferralWithDSBitNSEC3(sname=fmt.humanize_name(self.qname)))
+                if self._flags & _HAS_DS:
+                    self.errors.append(Errors.ReferralWithDSBitNSEC3(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
-                if self.has_soa:
-                    self.errors.append(Errors.ReferralWithSOABitNSEC3(sname=fmt.humanize_name(self.qname)))
+                if self._flags & _HAS_SOA:
+                    self.errors.append(Errors.ReferralWithSOABitNSEC3(sname=self.qname))
                     self.validation_status = NSEC_STATUS_INVALID
             # RFC 5155, section 8.5, 8.6
             else:
-                if self.has_rdtype:
-                    self.errors.append(Errors.StypeInBitmapNODATANSEC3(sname=fmt.humanize_name(self.qname), stype=dns.rdatatype.to_text(self.rdtype)))
+                if self._flags & _HAS_RDTYPE:
+                    self.errors.append(Errors.StypeInBitmapNODATANSEC3(sname=self.qname, stype=stype_text))
                     self.validation_status = NSEC_STATUS_INVALID
-                if self.has_cname:
-                    self.errors.append(Errors.StypeInBitmapNODATANSEC3(sname=fmt.humanize_name(self.qname), stype=dns.rdatatype.to_text(dns.rdatatype.CNAME)))
+                if self._flags & _HAS_CNAME:
+                    self.errors.append(Errors.StypeInBitmapNODATANSEC3(sname=self.qname, stype=_rdt_to_text(_RDT_CNAME)))
                     self.validation_status = NSEC_STATUS_INVALID
         elif self.nsec_for_wildcard_name:
             if not self.nsec_names_covering_qname:
                 self.validation_status = NSEC_STATUS_INVALID
                 if valid_algs:
-                    self.errors.append(Errors.NextClosestEncloserNotCoveredWildcardNODATA(next_closest_encloser=fmt.humanize_name(next_closest_encloser)))
+                    self.errors.append(Errors.NextClosestEncloserNotCoveredWildcardNODATA(next_closest_encloser=next_closest_encloser))
                 if invalid_algs:
                     self.errors.append(invalid_alg_err)
-            if self.wildcard_has_rdtype:
+            if self._flags & _WILDCARD_HAS_RDTYPE:
                 self.validation_status = NSEC_STATUS_INVALID
-                self.errors.append(Errors.StypeInBitmapWildcardNODATANSEC3(sname=fmt.humanize_name(self.get_wildcard()), stype=dns.rdatatype.to_text(self.rdtype)))
+                self.errors.append(Errors.StypeInBitmapWildcardNODATANSEC3(sname=self.get_wildcard(), stype=stype_text))
         elif self.nsec_names_covering_qname:
             if not self.opt_out:
                 self.validation_status = NSEC_STATUS_INVALID
                 if valid_algs:
-                    if self.rdtype == dns.rdatatype.DS:
+                    if self.rdtype == _RDT_DS:
                         cls = Errors.OptOutFlagNotSetNODATADS
                     else:
                         cls = Errors.OptOutFlagNotSetNODATA
                     next_closest_encloser = self.get_next_closest_encloser()
-                    self.errors.append(cls(next_closest_encloser=fmt.humanize_name(next_closest_encloser)))
+                    self.errors.append(cls(next_closest_encloser=next_closest_encloser))
                 if invalid_algs:
                     self.errors.append(invalid_alg_err)
         else:
             self.validation_status = NSEC_STATUS_INVALID
             if valid_algs:
-                if self.rdtype == dns.rdatatype.DS:
+                if self.rdtype == _RDT_DS:
                     cls = Errors.NoNSEC3MatchingSnameDSNODATA
                 else:
                     cls = Errors.NoNSEC3MatchingSnameNODATA
-                self.errors.append(cls(sname=fmt.humanize_name(self.qname)))
+                self.errors.append(cls(sname=self.qname))
             if invalid_algs:
                 self.errors.append(invalid_alg_err)
 
@@ -1485,143 +1566,61 @@ class NSEC3StatusNODATA(NSEC3Status):
                     covering_names.update(names)
             if self.nsec_for_wildcard_name is not None:
                 covering_names.update(self.nsec_for_wildcard_name)
-            self.nsec_set_info = nsec_set_info.project(*list(covering_names))
+            self.nsec_set_info = nsec_set_info.project(*covering_names)
         else:
-            self.nsec_set_info = nsec_set_info.project(*list(nsec_set_info.rrsets))
+            self.nsec_set_info = nsec_set_info.copy()
 
         # Report errors with NSEC3 owner names
         for name in self.nsec_set_info.invalid_nsec3_owner:
-            self.errors.append(Errors.InvalidNSEC3OwnerName(name=fmt.format_nsec3_name(name)))
+            self.errors.append(Errors.InvalidNSEC3OwnerName(name=_fmt_nsec3(name)))
         for name in self.nsec_set_info.invalid_nsec3_hash:
-            self.errors.append(Errors.InvalidNSEC3Hash(name=fmt.format_nsec3_name(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
-
-    def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
-        d = OrderedDict()
-
-        nsec3_list = []
-        for nsec_rrset in self.nsec_set_info.rrsets.values():
-            if rrset_info_serializer is not None:
-                nsec_serialized = rrset_info_serializer(nsec_rrset, consolidate_clients=consolidate_clients, show_servers=False, loglevel=loglevel, html_format=html_format)
-                if nsec_serialized:
-                    nsec3_list.append(nsec_serialized)
-            elif loglevel <= logging.DEBUG:
-                nsec3_list.append(nsec_rrset.serialize(consolidate_clients=consolidate_clients, html_format=html_format))
-
-        erroneous_status = self.validation_status != STATUS_VALID
-
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                (erroneous_status or nsec3_list)
-
-        if html_format:
-            formatter = lambda x: escape(x, True)
-        else:
-            formatter = lambda x: x
-
-        if show_id:
-            d['id'] = 'NSEC3'
-
-        if loglevel <= logging.DEBUG:
-            d['description'] = formatter(str(self))
-
-        if nsec3_list:
-            d['nsec3'] = nsec3_list
-
-        if loglevel <= logging.DEBUG:
-            if self.opt_out is not None:
-                d['opt_out'] = self.opt_out
-
-            if self.nsec_for_qname:
-                digest_name = list(self.name_digest_map[self.qname].items())[0][1]
-                if digest_name is not None:
-                    d['sname_hash'] = formatter(fmt.format_nsec3_name(digest_name))
-                else:
-                    d['sname_hash'] = None
-                d['sname_nsec_match'] = formatter(fmt.format_nsec3_name(list(self.nsec_for_qname)[0]))
-
-            if self.closest_encloser:
-                encloser_name, nsec_names = list(self.closest_encloser.items())[0]
-                nsec_name = list(nsec_names)[0]
-                d['closest_encloser'] = formatter(lb2s(encloser_name.canonicalize().to_text()))
-                d['closest_encloser_digest'] = formatter(fmt.format_nsec3_name(nsec_name))
-
-                next_closest_encloser = self._get_next_closest_encloser(encloser_name)
-                d['next_closest_encloser'] = formatter(lb2s(next_closest_encloser.canonicalize().to_text()))
-                digest_name = list(self.name_digest_map[next_closest_encloser].items())[0][1]
-                if digest_name is not None:
-                    d['next_closest_encloser_hash'] = formatter(fmt.format_nsec3_name(digest_name))
-                else:
-                    d['next_closest_encloser_hash'] = None
-
-                if self.nsec_names_covering_qname:
-                    qname, nsec_names = list(self.nsec_names_covering_qname.items())[0]
-                    nsec_name = list(nsec_names)[0]
-                    next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
-                    d['next_closest_encloser_covering'] = OrderedDict((
-                        ('covered_name', formatter(fmt.format_nsec3_name(qname))),
-                        ('nsec3_owner', formatter(fmt.format_nsec3_name(nsec_name))),
-                        ('nsec3_next', formatter(fmt.format_nsec3_name(next_name))),
-                    ))
-
-                wildcard_name = self._get_wildcard(encloser_name)
-                wildcard_digest = list(self.name_digest_map[wildcard_name].items())[0][1]
-                d['wildcard'] = formatter(lb2s(wildcard_name.canonicalize().to_text()))
-                if wildcard_digest is not None:
-                    d['wildcard_hash'] = formatter(fmt.format_nsec3_name(wildcard_digest))
-                else:
-                    d['wildcard_hash'] = None
-                if self.nsec_for_wildcard_name:
-                    d['wildcard_nsec_match'] = formatter(fmt.format_nsec3_name(list(self.nsec_for_wildcard_name)[0]))
-
-            if not self.nsec_for_qname and not self.closest_encloser:
-                digest_name = list(self.name_digest_map[self.qname].items())[0][1]
-                if digest_name is not None:
-                    d['sname_hash'] = formatter(fmt.format_nsec3_name(digest_name))
-                else:
-                    d['sname_hash'] = None
-
-        if loglevel <= logging.INFO or erroneous_status:
-            d['status'] = nsec_status_mapping[self.validation_status]
-
-        if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.nsec_set_info.servers_clients)
-            if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
-            d['servers'] = servers
+            self.errors.append(Errors.InvalidNSEC3Hash(name=_fmt_nsec3(name), nsec3_hash=lb2s(base32.b32encode(self.nsec_set_info.rrsets[name].rrset[0].next))))
 
-            if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
-                ns_names.sort()
-                d['ns_names'] = ns_names
+    def _serialize_nsec_details(self, d, formatter):
+        if self.opt_out is not None:
+            d['opt_out'] = self.opt_out
 
-            tags = set()
-            nsids = set()
-            for server,client in self.nsec_set_info.servers_clients:
-                for response in self.nsec_set_info.servers_clients[(server, client)]:
-                    if response is not None:
-                        tags.add(response.effective_query_tag())
-                        nsid = response.nsid_val()
-                        if nsid is not None:
-                            nsids.add(nsid)
-
-            if nsids:
-                d['nsid_values'] = list(nsids)
-                d['nsid_values'].sort()
-
-            d['query_options'] = list(tags)
-            d['query_options'].sort()
+        if self.nsec_for_qname:
+            digest_name = self._first_digest_name(self.qname)
+            d['sname_hash'] = formatter(_fmt_nsec3(digest_name)) if digest_name is not None else None
+            d['sname_nsec_match'] = formatter(_fmt_nsec3(next(iter(self.nsec_for_qname))))
 
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+        if self.closest_encloser:
+            encloser_name, nsec_names = self._first_encloser
+            nsec_name = next(iter(nsec_names))
+            d['closest_encloser'] = formatter(_canon_text(encloser_name))
+            d['closest_encloser_digest'] = formatter(_fmt_nsec3(nsec_name))
 
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+            next_closest_encloser = self._next_closest_encloser
+            d['next_closest_encloser'] = formatter(_canon_text(next_closest_encloser))
+            digest_name = self._first_digest_name(next_closest_encloser)
+            d['next_closest_encloser_hash'] = formatter(_fmt_nsec3(digest_name)) if digest_name is not None else None
 
-        return d
+            if self.nsec_names_covering_qname:
+                qname, nsec_names = next(iter(self.nsec_names_covering_qname.items()))
+                nsec_name = next(iter(nsec_names))
+                next_name = self.nsec_set_info.name_for_nsec3_next(nsec_name)
+                d['next_closest_encloser_covering'] = {
+                    'covered_name': formatter(_fmt_nsec3(qname)),
+                    'nsec3_owner': formatter(_fmt_nsec3(nsec_name)),
+                    'nsec3_next': formatter(_fmt_nsec3(next_name)),
+                }
+
+            wildcard_name = self._get_wildcard(encloser_name)
+            wildcard_digest = self._first_digest_name(wildcard_name)
+            d['wildcard'] = formatter(_canon_text(wildcard_name))
+            d['wildcard_hash'] = formatter(_fmt_nsec3(wildcard_digest)) if wildcard_digest is not None else None
+            if self.nsec_for_wildcard_name:
+                d['wildcard_nsec_match'] = formatter(_fmt_nsec3(next(iter(self.nsec_for_wildcard_name))))
+
+        if not self.nsec_for_qname and not self.closest_encloser:
+            digest_name = self._first_digest_name(self.qname)
+            d['sname_hash'] = formatter(_fmt_nsec3(digest_name)) if digest_name is not None else None
 
 class CNAMEFromDNAMEStatus(object):
+    __slots__ = ('synthesized_cname', 'included_cname', 'warnings', 'errors',
+            'validation_status')
+
     def __init__(self, synthesized_cname, included_cname):
         self.synthesized_cname = synthesized_cname
         self.included_cname = included_cname
@@ -1634,7 +1633,7 @@ class CNAMEFromDNAMEStatus(object):
         else:
             self.validation_status = DNAME_STATUS_VALID
             if self.included_cname.rrset[0].target != self.synthesized_cname.rrset[0].target:
-                self.errors.append(Errors.DNAMETargetMismatch(included_target=fmt.humanize_name(self.included_cname.rrset[0].target), synthesized_target=fmt.humanize_name(self.synthesized_cname.rrset[0].target)))
+                self.errors.append(Errors.DNAMETargetMismatch(included_target=self.included_cname.rrset[0].target, synthesized_target=self.synthesized_cname.rrset[0].target))
                 self.validation_status = DNAME_STATUS_INVALID_TARGET
             if self.included_cname.rrset.ttl != self.synthesized_cname.rrset.ttl:
                 if self.included_cname.rrset.ttl == 0:
@@ -1643,11 +1642,19 @@ class CNAMEFromDNAMEStatus(object):
                     self.warnings.append(Errors.DNAMETTLMismatch(cname_ttl=self.included_cname.rrset.ttl, dname_ttl=self.synthesized_cname.rrset.ttl))
 
     def __str__(self):
-        return 'CNAME synthesis for %s from %s/%s' % (fmt.humanize_name(self.synthesized_cname.rrset.name), fmt.humanize_name(self.synthesized_cname.dname_info.rrset.name), dns.rdatatype.to_text(self.synthesized_cname.dname_info.rrset.rdtype))
+        return 'CNAME synthesis for %s from %s/%s' % (_human_text(self.synthesized_cname.rrset.name), _human_text(self.synthesized_cname.dname_info.rrset.name), _rdt_to_text(self.synthesized_cname.dname_info.rrset.rdtype))
 
     def serialize(self, rrset_info_serializer=None, consolidate_clients=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
+        warnings = self.warnings
+        errors = self.errors
+        if rrset_info_serializer is None and loglevel > logging.INFO and \
+                self.validation_status == STATUS_VALID and \
+                not (warnings and loglevel <= logging.WARNING) and \
+                not (errors and loglevel <= logging.ERROR):
+            return {}
+
         values = []
-        d = OrderedDict()
+        d = {}
 
         dname_serialized = None
         if rrset_info_serializer is not None:
@@ -1657,10 +1664,10 @@ class CNAMEFromDNAMEStatus(object):
 
         erroneous_status = self.validation_status != STATUS_VALID
 
-        show_id = loglevel <= logging.INFO or \
-                (self.warnings and loglevel <= logging.WARNING) or \
-                (self.errors and loglevel <= logging.ERROR) or \
-                (erroneous_status or dname_serialized)
+        show_id = (erroneous_status or dname_serialized) or \
+                loglevel <= logging.INFO or \
+                (warnings and loglevel <= logging.WARNING) or \
+                (errors and loglevel <= logging.ERROR)
 
         if html_format:
             formatter = lambda x: escape(x, True)
@@ -1668,7 +1675,7 @@ class CNAMEFromDNAMEStatus(object):
             formatter = lambda x: x
 
         if show_id:
-            d['id'] = lb2s(self.synthesized_cname.dname_info.rrset.name.canonicalize().to_text())
+            d['id'] = _canon_text(self.synthesized_cname.dname_info.rrset.name)
 
         if loglevel <= logging.DEBUG:
             d['description'] = formatter(str(self))
@@ -1678,21 +1685,21 @@ class CNAMEFromDNAMEStatus(object):
 
         if loglevel <= logging.DEBUG:
             if self.included_cname is not None:
-                d['cname_owner'] = formatter(lb2s(self.included_cname.rrset.name.canonicalize().to_text()))
-                d['cname_target'] = formatter(lb2s(self.included_cname.rrset[0].target.canonicalize().to_text()))
+                d['cname_owner'] = formatter(_canon_text(self.included_cname.rrset.name))
+                d['cname_target'] = formatter(_canon_text(self.included_cname.rrset[0].target))
 
         if loglevel <= logging.INFO or erroneous_status:
             d['status'] = dname_status_mapping[self.validation_status]
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.synthesized_cname.dname_info.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self.synthesized_cname.dname_info.servers_sorted()
+            else:
+                servers = tuple_to_dict(self.synthesized_cname.dname_info.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
@@ -1713,10 +1720,10 @@ class CNAMEFromDNAMEStatus(object):
             d['query_options'] = list(tags)
             d['query_options'].sort()
 
-        if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+        if warnings and loglevel <= logging.WARNING:
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in warnings]
 
-        if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+        if errors and loglevel <= logging.ERROR:
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in errors]
 
         return d
@@ -457,6 +457,13 @@ def get_digest_for_nsec3(val, salt, alg, iterations):
     if alg == 1:
         hash_func = hashlib.sha1
 
-    for i in range(iterations + 1):
-        val = hash_func(val + salt).digest()
+    # hashlib dispatches to OpenSSL, which uses the hardware SHA-1
+    # instructions where available; the iteration loop itself is the only
+    # python-level cost, so keep it tight
+    if not salt:
+        for i in range(iterations + 1):
+            val = hash_func(val).digest()
+    else:
+        for i in range(iterations + 1):
+            val = hash_func(val + salt).digest()
     return val
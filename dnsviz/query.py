@@ -1152,8 +1152,7 @@ class DNSQuery(object):
             d['options']['tcp'] = self.tcp
 
         d['responses'] = OrderedDict()
-        servers = list(self.responses.keys())
-        servers.sort()
+        servers = sorted(self.responses)
         for server in servers:
             d['responses'][server] = OrderedDict()
             clients = list(self.responses[server].keys())
@@ -140,10 +140,10 @@ class Resolver:
         return Resolver(servers, query_cls, **kwargs)
 
     def query(self, qname, rdtype, rdclass=dns.rdataclass.IN, accept_first_response=False, continue_on_servfail=True):
-        return list(self.query_multiple((qname, rdtype, rdclass), accept_first_response=accept_first_response, continue_on_servfail=continue_on_servfail).values())[0]
+        return next(iter(self.query_multiple((qname, rdtype, rdclass), accept_first_response=accept_first_response, continue_on_servfail=continue_on_servfail).values()))
 
     def query_for_answer(self, qname, rdtype, rdclass=dns.rdataclass.IN, allow_noanswer=False):
-        answer = list(self.query_multiple_for_answer((qname, rdtype, rdclass), allow_noanswer=allow_noanswer).values())[0]
+        answer = next(iter(self.query_multiple_for_answer((qname, rdtype, rdclass), allow_noanswer=allow_noanswer).values()))
         if isinstance(answer, DNSAnswer):
             return answer
         else:
@@ -237,14 +237,14 @@ class Resolver:
                 # no response means we didn't even try because we don't have
                 # proper connectivity
                 if not q.responses:
-                    server = list(q.servers)[0]
+                    server = next(iter(q.servers))
                     valid_servers[query_tuple].remove(server)
                     if not valid_servers[query_tuple]:
                         last_responses[query_tuple] = server, None
                     continue
 
-                server, client_response = list(q.responses.items())[0]
-                client, response = list(client_response.items())[0]
+                server, client_response = next(iter(q.responses.items()))
+                client, response = next(iter(client_response.items()))
                 responses[query_tuple] = (server, response)
                 # if we received a complete message with an acceptable rcode,
                 # then accept it as the last response
@@ -584,8 +584,8 @@ class FullResolver:
                             # No network connectivity
                             continue
 
-                        server1, client_response = list(q.responses.items())[0]
-                        client, response = list(client_response.items())[0]
+                        server1, client_response = next(iter(q.responses.items()))
+                        client, response = next(iter(client_response.items()))
 
                         server_cookie = response.get_server_cookie()
                         if server_cookie is not None:
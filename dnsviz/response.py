@@ -29,6 +29,7 @@ from __future__ import unicode_literals
 
 import base64
 import binascii
+import bisect
 import copy
 import errno
 import codecs
@@ -61,6 +62,29 @@ from .ipaddr import IPAddr
 from .util import tuple_to_dict
 lb2s = fmt.latin1_binary_to_string
 
+# The same (name, salt, algorithm, iterations) combinations recur across the
+# status objects built for a response set, and each digest costs
+# iterations+1 hash rounds.  Cache the resulting digest names process-wide;
+# the cache is simply cleared if it ever reaches its maximum size.
+_NSEC3_DIGEST_CACHE_MAX_SIZE = 4096
+_nsec3_digest_name_cache = {}
+
+# the canonical text form of a name never changes; cache it rather than
+# creating a new name object and rebuilding the string every time one is
+# serialized
+_NAME_TEXT_CACHE_MAX_SIZE = 4096
+_canonical_name_text_cache = {}
+
+def _canon_text(name):
+    try:
+        return _canonical_name_text_cache[name]
+    except KeyError:
+        if len(_canonical_name_text_cache) >= _NAME_TEXT_CACHE_MAX_SIZE:
+            _canonical_name_text_cache.clear()
+        text = lb2s(name.canonicalize().to_text())
+        _canonical_name_text_cache[name] = text
+        return text
+
 class DNSResponse:
     '''A DNS response, including meta information'''
 
@@ -772,11 +796,22 @@ class DNSResponse:
 class DNSResponseComponent(object):
     def __init__(self):
         self.servers_clients = {}
+        self._servers_sorted = None
 
     def add_server_client(self, server, client, response):
         if (server, client) not in self.servers_clients:
             self.servers_clients[(server, client)] = []
         self.servers_clients[(server, client)].append(response)
+        self._servers_sorted = None
+
+    def servers_sorted(self):
+        '''Return a sorted list of the servers from which this component was
+        received.  The list is computed once and reused across multiple
+        serializations.'''
+
+        if self._servers_sorted is None:
+            self._servers_sorted = sorted(tuple_to_dict(self.servers_clients))
+        return self._servers_sorted
 
     @classmethod
     def insert_into_list(cls, component_info, component_info_list, server, client, response):
@@ -811,6 +846,10 @@ class DNSKEYMeta(DNSResponseComponent):
         self.key_tag_no_revoke = self.calc_key_tag(rdata, True)
         self.key_len = self.calc_key_len(rdata)
 
+        # lazily computed by message_for_ds(); the name and key data never
+        # change, so the message is built at most once per flags variant
+        self._message_for_ds = {}
+
     def __str__(self):
         return 'DNSKEY for %s (algorithm %d (%s), key tag %d)' % (fmt.humanize_name(self.name), self.rdata.algorithm, fmt.DNSKEY_ALGORITHMS.get(self.rdata.algorithm, self.rdata.algorithm), self.key_tag)
 
@@ -920,6 +959,11 @@ class DNSKEYMeta(DNSResponseComponent):
         '''Return the string value suitable for hashing to create a DS
         record.'''
 
+        try:
+            return self._message_for_ds[clear_revoke]
+        except KeyError:
+            pass
+
         if clear_revoke:
             flags = self.rdata.flags & (~fmt.DNSKEY_FLAGS['revoke'])
         else:
@@ -930,7 +974,9 @@ class DNSKEYMeta(DNSResponseComponent):
         # write DNSKEY rdata in wire format
         rdata_wire = struct.pack(b'!HBB', flags, self.rdata.protocol, self.rdata.algorithm)
 
-        return name_wire + rdata_wire + self.rdata.key
+        msg = name_wire + rdata_wire + self.rdata.key
+        self._message_for_ds[clear_revoke] = msg
+        return msg
 
     def serialize(self, consolidate_clients=True, show_servers=True, loglevel=logging.DEBUG, html_format=False, map_ip_to_ns_name=None):
         from .analysis import status as Status
@@ -974,14 +1020,14 @@ class DNSKEYMeta(DNSResponseComponent):
         #TODO: put DNSKEY roles in meta, if it makes sense
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self.servers_sorted()
+            else:
+                servers = tuple_to_dict(self.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
@@ -1002,10 +1048,10 @@ class DNSKEYMeta(DNSResponseComponent):
             d['query_options'].sort()
 
         if self.warnings and loglevel <= logging.WARNING:
-            d['warnings'] = [w.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for w in self.warnings]
+            d['warnings'] = [w.serialize(consolidate_clients, html_format) for w in self.warnings]
 
         if self.errors and loglevel <= logging.ERROR:
-            d['errors'] = [e.serialize(consolidate_clients=consolidate_clients, html_format=html_format) for e in self.errors]
+            d['errors'] = [e.serialize(consolidate_clients, html_format) for e in self.errors]
 
         return d
 
@@ -1143,7 +1189,7 @@ class RRsetInfo(DNSResponseComponent):
         if self.rrset.rdtype == dns.rdatatype.NSEC3:
             d['name'] = formatter(fmt.format_nsec3_name(self.rrset.name))
         else:
-            d['name'] = formatter(lb2s(self.rrset.name.canonicalize().to_text()))
+            d['name'] = formatter(_canon_text(self.rrset.name))
         d['ttl'] = self.rrset.ttl
         d['type'] = dns.rdatatype.to_text(self.rrset.rdtype)
         d['rdata'] = []
@@ -1161,14 +1207,14 @@ class RRsetInfo(DNSResponseComponent):
                 d['rdata'].append(formatter(s))
 
         if loglevel <= logging.INFO:
-            servers = tuple_to_dict(self.servers_clients)
             if consolidate_clients:
-                servers = list(servers)
-                servers.sort()
+                servers = self.servers_sorted()
+            else:
+                servers = tuple_to_dict(self.servers_clients)
             d['servers'] = servers
 
             if map_ip_to_ns_name is not None:
-                ns_names = list(set([lb2s(map_ip_to_ns_name(s)[0][0].canonicalize().to_text()) for s in servers]))
+                ns_names = list(set([_canon_text(map_ip_to_ns_name(s)[0][0]) for s in servers]))
                 ns_names.sort()
                 d['ns_names'] = ns_names
 
@@ -1256,6 +1302,11 @@ class NSECSet(DNSResponseComponent):
         self.invalid_nsec3_owner = set()
         self.invalid_nsec3_hash = set()
         self.use_nsec3 = False
+        # lazily computed caches; the NSEC(3) RRsets comprising the set don't
+        # change once it has been fully built
+        self._covering_candidates = None
+        self._nsec3_next_name_cache = {}
+        self._nsec3_ring = {}
         for rrset in rrsets:
             #XXX There shouldn't be multiple NSEC(3) RRsets of the same owner
             # name in the same response, but check for it and address it (if
@@ -1307,6 +1358,21 @@ class NSECSet(DNSResponseComponent):
         obj.servers_clients = self.servers_clients.copy()
         return obj
 
+    def copy(self):
+        '''Return a shallow copy of the NSECSet, sharing the RRset info
+        objects.  This is equivalent to projecting every name in the set, but
+        without re-validating the NSEC3 owner names and hashes.'''
+
+        obj = self.__class__((), self.referral, self.ttl_cmp)
+        obj.rrsets = self.rrsets.copy()
+        obj.use_nsec3 = self.use_nsec3
+        for key in self.nsec3_params:
+            obj.nsec3_params[key] = set(self.nsec3_params[key])
+        obj.invalid_nsec3_owner = set(self.invalid_nsec3_owner)
+        obj.invalid_nsec3_hash = set(self.invalid_nsec3_hash)
+        obj.servers_clients = self.servers_clients.copy()
+        return obj
+
     def add_server_client(self, server, client, response):
         super(NSECSet, self).add_server_client(server, client, response)
         for name, rrset_info in self.rrsets.items():
@@ -1368,13 +1434,49 @@ class NSECSet(DNSResponseComponent):
                 pass
         return False
 
+    def rdtypes_exist_in_bitmap(self, nsec_name, rdtypes):
+        '''Return the set of rdtypes, from among those provided, that exist
+        in the bitmap of the NSEC(3) record corresponding to the name,
+        walking the bitmap windows only once.'''
+
+        window_map = dict(self.rrsets[nsec_name].rrset[0].windows)
+        found = set()
+        for rdtype in rdtypes:
+            try:
+                bitmap = window_map[rdtype >> 8]
+                bitmap_index, bitmap_offset = divmod(rdtype & 0x00ff, 8)
+                # dnspython <= 1.12.x uses strings, but dnspython 1.13 uses bytearray (for python3)
+                byte = bitmap[bitmap_index]
+                if isinstance(bitmap, str):
+                    byte = ord(byte)
+                if byte & (0x80 >> bitmap_offset):
+                    found.add(rdtype)
+            except (KeyError, IndexError):
+                pass
+        return found
+
     def name_for_nsec3_next(self, nsec_name):
         '''Convert the next field of an NSEC3 RR to a DNS name.'''
 
-        next_name = self.rrsets[nsec_name].rrset[0].next
-        next_name_txt = base32.b32encode(next_name)
-        origin = dns.name.Name(nsec_name.labels[1:])
-        return dns.name.from_text(next_name_txt, origin)
+        try:
+            return self._nsec3_next_name_cache[nsec_name]
+        except KeyError:
+            next_name = self.rrsets[nsec_name].rrset[0].next
+            next_name_txt = base32.b32encode(next_name)
+            origin = dns.name.Name(nsec_name.labels[1:])
+            name = dns.name.from_text(next_name_txt, origin)
+            self._nsec3_next_name_cache[nsec_name] = name
+            return name
+
+    def _get_covering_candidates(self):
+        '''Return the set of owner names of NSEC(3) records that are eligible
+        to cover a name, i.e., all owner names except those with invalid NSEC3
+        owner names or hashes.  The set is computed once and reused for
+        subsequent covering checks.'''
+
+        if self._covering_candidates is None:
+            self._covering_candidates = set(self.rrsets).difference(self.invalid_nsec3_owner.union(self.invalid_nsec3_hash))
+        return self._covering_candidates
 
     def _nsec_covers_name(self, name, nsec_name):
         '''Return True if the NSEC record corresponding to NSEC name provided
@@ -1404,7 +1506,7 @@ class NSECSet(DNSResponseComponent):
         response that cover the given name.'''
 
         excluding_names = set()
-        for nsec_name in set(self.rrsets).difference(self.invalid_nsec3_owner.union(self.invalid_nsec3_hash)):
+        for nsec_name in self._get_covering_candidates():
             if self._nsec_covers_name(name, nsec_name):
                 excluding_names.add(nsec_name)
         return excluding_names
@@ -1413,19 +1515,66 @@ class NSECSet(DNSResponseComponent):
         '''Return the DNS name corresponding to the name, origin, and NSEC3
         hash parameters provided.'''
 
-        val = name.canonicalize().to_wire()
-        digest = crypto.get_digest_for_nsec3(val, salt, alg, iterations)
+        cache_key = (name, origin, salt, alg, iterations)
+        try:
+            return _nsec3_digest_name_cache[cache_key]
+        except KeyError:
+            pass
+
+        if not crypto.nsec3_alg_is_supported(alg):
+            # There will be no digest, so don't bother building the canonical
+            # wire form; get_digest_for_nsec3() still logs the lack of
+            # algorithm support.
+            digest = crypto.get_digest_for_nsec3(b'', salt, alg, iterations)
+        else:
+            digest = crypto.get_digest_for_nsec3(name.canonicalize().to_wire(), salt, alg, iterations)
         if digest is None:
-            return None
+            digest_name = None
         else:
-            return dns.name.from_text(base32.b32encode(digest), origin)
+            digest_name = dns.name.from_text(base32.b32encode(digest), origin)
+
+        if len(_nsec3_digest_name_cache) >= _NSEC3_DIGEST_CACHE_MAX_SIZE:
+            _nsec3_digest_name_cache.clear()
+        _nsec3_digest_name_cache[cache_key] = digest_name
+        return digest_name
+
+    def _get_nsec3_ring(self, salt, alg, iterations):
+        '''Return a sorted list of the owner names of NSEC3 records with the
+        given parameters, if those records form a proper ring--that is, the
+        next hash of each record corresponds to the owner name that follows it
+        in sorted order, wrapping around at the end.  Return None if they do
+        not, in which case covering checks must examine every record.'''
+
+        key = (salt, alg, iterations)
+        try:
+            return self._nsec3_ring[key]
+        except KeyError:
+            pass
+        owners = sorted(self.nsec3_params[key].intersection(self._get_covering_candidates()))
+        ring = owners
+        for i, nsec_name in enumerate(owners):
+            if self.name_for_nsec3_next(nsec_name) != owners[(i + 1) % len(owners)]:
+                ring = None
+                break
+        self._nsec3_ring[key] = ring
+        return ring
 
     def nsec3_covering_name(self, name, salt, alg, iterations):
         '''Return the set of owner names corresponding to NSEC3 records in the
         response that cover the given (digest) name.'''
 
         excluding_names = set()
-        for nsec_name in set(self.nsec3_params[(salt, alg, iterations)]).difference(self.invalid_nsec3_owner.union(self.invalid_nsec3_hash)):
+        ring = self._get_nsec3_ring(salt, alg, iterations)
+        if ring is not None:
+            # with a proper ring the intervals are disjoint, so the only
+            # record that can cover the name is the one whose owner name
+            # immediately precedes it in sorted order (wrapping around)
+            if ring:
+                nsec_name = ring[bisect.bisect_left(ring, name) - 1]
+                if self._nsec_covers_name(name, nsec_name):
+                    excluding_names.add(nsec_name)
+            return excluding_names
+        for nsec_name in self.nsec3_params[(salt, alg, iterations)].intersection(self._get_covering_candidates()):
             if self._nsec_covers_name(name, nsec_name):
                 excluding_names.add(nsec_name)
         return excluding_names
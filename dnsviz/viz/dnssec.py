@@ -131,8 +131,7 @@ class RRsetNonExistent(object):
 
         servers = tuple_to_dict(self.servers_clients)
         if consolidate_clients:
-            servers = list(servers)
-            servers.sort()
+            servers = sorted(servers)
         d['servers'] = servers
 
         if map_ip_to_ns_name is not None: